@@ -1,15 +1,130 @@
+from array import array
 from collections import deque
 import copy
+import gzip
+import hashlib
+import heapq
+import math
+import mmap
+import multiprocessing
+import operator
+import os
 import random
+import struct
 import sys
+import tempfile
+import time
+import zlib
 from datetime import datetime
 
+import numpy as np
+
 def tee_print(*args, **kwargs):
     """Print to both console and file."""
     print(*args, **kwargs)
-    if 'file' in kwargs:
+    if kwargs.get('file') is not None:
         print(*args)  # Also print to console if writing to file
 
+class TeeSink:
+    """Default print_tree output: every line goes through tee_print."""
+    detail = True
+    
+    def __init__(self, output_file=None):
+        self.output_file = output_file
+    
+    def write(self, text=""):
+        tee_print(text, file=self.output_file)
+    
+    def flush(self):
+        pass
+
+class OutputSink:
+    """
+    Buffered print_tree output. Lines are joined and written in large
+    blocks to a file (gzip-compressed if asked) and, unless console is
+    off, to stdout. With summary_only the tree walk skips per-node
+    formatting and only headers and the depth summary are written.
+    """
+    def __init__(self, path=None, file=None, console=True, compress=False,
+                 summary_only=False, buffer_size=1 << 20):
+        self.owned = None
+        if path is not None:
+            self.owned = gzip.open(path, 'wt', encoding='utf-8') if compress else \
+                open(path, 'w', encoding='utf-8', buffering=buffer_size)
+            file = self.owned
+        self.file = file
+        self.console = console
+        self.detail = not summary_only
+        self.buffer_size = buffer_size
+        self.lines = []
+        self.pending = 0
+    
+    def write(self, text=""):
+        self.lines.append(text)
+        self.pending += len(text) + 1
+        if self.pending >= self.buffer_size:
+            self.flush()
+    
+    def flush(self):
+        if not self.lines:
+            return
+        block = '\n'.join(self.lines) + '\n'
+        self.lines = []
+        self.pending = 0
+        if self.file is not None:
+            self.file.write(block)
+        if self.console:
+            sys.stdout.write(block)
+    
+    def close(self):
+        self.flush()
+        if self.owned is not None:
+            self.owned.close()
+            self.owned = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+def shard_of(node_id, shards):
+    """Shard number for a node id that is the same in every process."""
+    if isinstance(node_id, int):
+        return ((node_id * 0x9E3779B97F4A7C15) >> 17) % shards
+    return zlib.crc32(repr(node_id).encode()) % shards
+
+def expand_shard(tree, shard, shards, conn):
+    """
+    Worker for StateSpaceTree.count_tree_parallel. Owns the visited set for
+    one shard: each round it receives candidate nodes, keeps the unseen
+    ones, expands them and sends back their children bucketed by shard.
+    """
+    visited = set()
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        nodes, expand = message
+        buckets = [{} for _ in range(shards)]
+        new_nodes = 0
+        for node in nodes:
+            node_id = tree.node_id(node)
+            if node_id in visited:
+                continue
+            visited.add(node_id)
+            new_nodes += 1
+            if not expand:
+                continue
+            for child in tree.expand_node(node):
+                child_id = tree.node_id(child)
+                target = shard_of(child_id, shards)
+                if target == shard and child_id in visited:
+                    continue
+                buckets[target][child_id] = child
+        conn.send((new_nodes, [list(bucket.values()) for bucket in buckets]))
+    conn.close()
+
 class StateSpaceTree:
     # [Previous StateSpaceTree class implementation remains the same]
     def __init__(self, initial_state, goal_state=None):
@@ -31,21 +146,93 @@ class StateSpaceTree:
     def generate_moves(self, state):
         raise NotImplementedError("Must implement generate_moves for specific problem")
     
-    def print_tree(self, max_depth=3, output_file=None):
-        queue = deque([(self.initial_state, None, 0, "")])
+    # Node hooks used by print_tree. By default a node is the state itself;
+    # subclasses can swap in a compact encoding without touching the traversal.
+    def encode_state(self, state):
+        return state
+    
+    def decode_state(self, node):
+        return node
+    
+    def node_id(self, node):
+        return self.get_state_id(node)
+    
+    def expand_node(self, node):
+        return self.generate_moves(node)
+    
+    def count_tree_parallel(self, max_depth=3, workers=None):
+        """
+        Level-synchronous BFS on a pool of processes. Each worker owns the
+        node ids that hash to its shard and deduplicates them locally; the
+        parent only routes children between shards. Returns the same
+        {depth: count} histogram as print_tree.
+        """
+        workers = workers or os.cpu_count() or 1
+        conns, procs = [], []
+        for shard in range(workers):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            proc = multiprocessing.Process(target=expand_shard, args=(self, shard, workers, child_conn), daemon=True)
+            proc.start()
+            child_conn.close()
+            conns.append(parent_conn)
+            procs.append(proc)
+        
+        start = self.encode_state(self.initial_state)
+        inbox = [[] for _ in range(workers)]
+        inbox[shard_of(self.node_id(start), workers)].append(start)
+        nodes_at_depth = {i: 0 for i in range(max_depth + 1)}
+        try:
+            for depth in range(max_depth + 1):
+                for conn, nodes in zip(conns, inbox):
+                    conn.send((nodes, depth < max_depth))
+                inbox = [[] for _ in range(workers)]
+                for conn in conns:
+                    new_nodes, buckets = conn.recv()
+                    nodes_at_depth[depth] += new_nodes
+                    for target, bucket in enumerate(buckets):
+                        inbox[target].extend(bucket)
+                if not any(inbox):
+                    break
+        finally:
+            for conn in conns:
+                conn.send(None)
+                conn.close()
+            for proc in procs:
+                proc.join()
+        return nodes_at_depth
+
+    def print_tree(self, max_depth=3, output_file=None, sink=None, workers=None):
+        """
+        Print the tree breadth-first up to max_depth. Output goes to sink
+        (TeeSink or OutputSink); by default it is tee'd to output_file.
+        With workers, levels are expanded by count_tree_parallel, which
+        only supports a summary_only sink.
+        """
+        if sink is None:
+            sink = TeeSink(output_file)
+        write = sink.write
+        detail = sink.detail
+        if workers and detail:
+            raise ValueError("Parallel expansion only supports summary-only output")
+        queue = deque([(self.encode_state(self.initial_state), None, 0, "")])
         self.visited_states = set()
         nodes_at_depth = {i: 0 for i in range(max_depth + 1)}
         total_nodes = 0
         
-        tee_print("\nGenerating State Space Tree...", file=output_file)
-        tee_print("=" * 40, file=output_file)
+        write("\nGenerating State Space Tree...")
+        write("=" * 40)
+        
+        if workers:
+            queue.clear()
+            nodes_at_depth = self.count_tree_parallel(max_depth, workers)
+            total_nodes = sum(nodes_at_depth.values())
         
         while queue:
-            current_state, parent, depth, prefix = queue.popleft()
+            current_node, parent, depth, prefix = queue.popleft()
             if depth > max_depth:
                 continue
                 
-            state_id = self.get_state_id(current_state)
+            state_id = self.node_id(current_node)
             if state_id in self.visited_states:
                 continue
                 
@@ -53,28 +240,636 @@ class StateSpaceTree:
             nodes_at_depth[depth] += 1
             total_nodes += 1
             
-            tee_print(file=output_file)
-            if depth == 0:
-                tee_print("Root State (Depth 0):", file=output_file)
-            else:
-                tee_print(f"{prefix}+-- State at depth {depth}", file=output_file)
-            tee_print(prefix + "    " + self.format_state(current_state).replace('\n', '\n' + prefix + "    "), file=output_file)
+            if detail:
+                write()
+                if depth == 0:
+                    write("Root State (Depth 0):")
+                else:
+                    write(f"{prefix}+-- State at depth {depth}")
+                write(prefix + "    " + self.format_state(self.decode_state(current_node)).replace('\n', '\n' + prefix + "    "))
             
-            children = self.generate_moves(current_state)
+            children = self.expand_node(current_node)
             for i, child in enumerate(children):
-                child_id = self.get_state_id(child)
+                child_id = self.node_id(child)
                 if child_id not in self.visited_states:
-                    new_prefix = prefix + ("    " if i == len(children) - 1 else "|   ")
-                    queue.append((child, current_state, depth + 1, new_prefix))
+                    new_prefix = prefix + ("    " if i == len(children) - 1 else "|   ") if detail else ""
+                    queue.append((child, current_node, depth + 1, new_prefix))
         
-        tee_print("\nTree Generation Summary", file=output_file)
-        tee_print("=" * 40, file=output_file)
-        tee_print(f"Total nodes generated: {total_nodes}", file=output_file)
+        write("\nTree Generation Summary")
+        write("=" * 40)
+        write(f"Total nodes generated: {total_nodes}")
         for depth, count in nodes_at_depth.items():
             if count > 0:
-                tee_print(f"Nodes at depth {depth}: {count}", file=output_file)
+                write(f"Nodes at depth {depth}: {count}")
+        sink.flush()
+
+    def bidirectional_search(self):
+        """
+        Breadth-first search from initial_state and goal_state at once,
+        expanding a whole layer on each side in turn until the frontiers
+        meet. Moves must be reversible. Returns (path, stats), where path
+        is the list of nodes from initial to goal, or None.
+        """
+        start = self.encode_state(self.initial_state)
+        goal = self.encode_state(self.goal_state)
+        # Per side: node id -> (parent id, node)
+        parents = [{self.node_id(start): (None, start)}, {self.node_id(goal): (None, goal)}]
+        frontiers = [[start], [goal]]
+        stats = {"expanded": 0, "generated": 0}
+        meet = self.node_id(start) if self.node_id(start) in parents[1] else None
+        side = 0
+        
+        while meet is None and frontiers[0] and frontiers[1]:
+            mine, other = parents[side], parents[1 - side]
+            next_frontier = []
+            for node in frontiers[side]:
+                stats["expanded"] += 1
+                node_id = self.node_id(node)
+                for child in self.expand_node(node):
+                    child_id = self.node_id(child)
+                    if child_id in mine:
+                        continue
+                    mine[child_id] = (node_id, child)
+                    next_frontier.append(child)
+                    stats["generated"] += 1
+                    # Layers are expanded whole, so the first contact is a shortest path
+                    if child_id in other:
+                        meet = child_id
+                        break
+                if meet is not None:
+                    break
+            frontiers[side] = next_frontier
+            side = 1 - side
+        
+        stats["nodes_held"] = len(parents[0]) + len(parents[1])
+        if meet is None:
+            return None, stats
+        
+        path = []
+        node_id = meet
+        while node_id is not None:
+            node_id, node = parents[0][node_id]
+            path.append(node)
+        path.reverse()
+        node_id = parents[1][meet][0]
+        while node_id is not None:
+            node_id, node = parents[1][node_id]
+            path.append(node)
+        return path, stats
+
+def permutation_rank(tiles):
+    """Lehmer rank of a permutation of 0..n-1, in the range [0, n!)."""
+    n = len(tiles)
+    rank = 0
+    used = 0
+    for i, tile in enumerate(tiles):
+        smaller_used = bin(used & ((1 << tile) - 1)).count("1")
+        rank = rank * (n - i) + tile - smaller_used
+        used |= 1 << tile
+    return rank
+
+def permutation_unrank(rank, n):
+    """Inverse of permutation_rank."""
+    digits = [0] * n
+    for i in range(n - 1, -1, -1):
+        rank, digits[i] = divmod(rank, n - i)
+    available = list(range(n))
+    return [available.pop(digit) for digit in digits]
+
+def byte_table(path, length, fill):
+    """A writable table of length bytes, memory-mapped from path."""
+    with open(path, 'wb') as f:
+        if fill == 0:
+            f.truncate(length)
+        else:
+            block = bytes([fill]) * (1 << 20)
+            for offset in range(0, length, len(block)):
+                f.write(block[:length - offset])
+    with open(path, 'r+b') as f:
+        return mmap.mmap(f.fileno(), length)
+
+class ManhattanLinearConflict:
+    """
+    Manhattan distance plus linear conflicts, measured against an arbitrary
+    goal layout. Boards are flat row-major tile lists with 0 as the blank.
+    """
+    def __init__(self, size, goal_tiles):
+        self.size = size
+        cells = size * size
+        self.goal_pos = [0] * cells
+        for pos, tile in enumerate(goal_tiles):
+            self.goal_pos[tile] = pos
+        
+        # distance[tile][pos]: Manhattan distance of tile at pos from its goal
+        self.distance = []
+        for tile in range(cells):
+            goal_row, goal_col = divmod(self.goal_pos[tile], size)
+            self.distance.append([0 if tile == 0 else abs(pos // size - goal_row) + abs(pos % size - goal_col)
+                                  for pos in range(cells)])
+        
+        self.rows = [tuple(range(r * size, (r + 1) * size)) for r in range(size)]
+        self.cols = [tuple(range(c, cells, size)) for c in range(size)]
+        # Lines 0..size-1 are rows, size..2*size-1 columns; each reads its tiles with one C call
+        self.lines = self.rows + self.cols
+        self.readers = [operator.itemgetter(*cells) for cells in self.lines]
+        self.line_cache = [{} for _ in self.lines]
+        self.goal_row = [self.goal_pos[tile] // size for tile in range(cells)]
+        self.goal_col = [self.goal_pos[tile] % size + size for tile in range(cells)]
+    
+    def line_conflict(self, tiles, line):
+        """Extra moves forced by tiles sharing their goal line but in reversed order."""
+        key = self.readers[line](tiles)
+        cost = self.line_cache[line].get(key)
+        if cost is None:
+            # Goal offsets, in current order, of the tiles whose goal is this line
+            size = self.size
+            goal_line = self.goal_row if line < size else self.goal_col
+            offsets = [self.goal_pos[tile] for tile in key if tile != 0 and goal_line[tile] == line]
+            # Every tile outside the longest increasing run has to leave the line
+            longest = [1] * len(offsets)
+            for i in range(len(offsets)):
+                for j in range(i):
+                    if offsets[j] < offsets[i] and longest[j] + 1 > longest[i]:
+                        longest[i] = longest[j] + 1
+            cost = 2 * (len(offsets) - max(longest, default=0))
+            self.line_cache[line][key] = cost
+        return cost
+    
+    def __call__(self, tiles):
+        total = sum(self.distance[tile][pos] for pos, tile in enumerate(tiles))
+        for line in range(len(self.lines)):
+            total += self.line_conflict(tiles, line)
+        return total
+    
+    def update(self, h, tiles, from_pos, to_pos):
+        """
+        Heuristic after the tile at from_pos slid into the blank at to_pos.
+        tiles already reflects the move. Only the moved tile's own goal line
+        can change its conflicts, and only if the tile entered or left it,
+        so most moves need no line lookup at all.
+        """
+        tile = tiles[to_pos]
+        h += self.distance[tile][to_pos] - self.distance[tile][from_pos]
+        size = self.size
+        if from_pos // size == to_pos // size:
+            line = self.goal_col[tile]  # Sideways move crosses columns
+            if line != from_pos % size + size and line != to_pos % size + size:
+                return h
+        else:
+            line = self.goal_row[tile]  # Vertical move crosses rows
+            if line != from_pos // size and line != to_pos // size:
+                return h
+        h += self.line_conflict(tiles, line)
+        tiles[from_pos], tiles[to_pos] = tile, 0
+        h -= self.line_conflict(tiles, line)
+        tiles[from_pos], tiles[to_pos] = 0, tile
+        return h
+
+# Korf & Felner's 6-6-3 split of the 15-puzzle tiles
+FIFTEEN_PUZZLE_663 = [(1, 5, 6, 9, 10, 13), (7, 8, 11, 12, 14, 15), (2, 3, 4)]
+
+def default_patterns(size):
+    """Split tiles 1..n-1 into row-major groups small enough to build quickly."""
+    group = {3: 4, 4: 5}.get(size, 4)
+    tiles = list(range(1, size * size))
+    return [tuple(tiles[i:i + group]) for i in range(0, len(tiles), group)]
+
+def build_pattern_table(size, goal_tiles, pattern):
+    """
+    Retrograde BFS from the goal over abstract states made of the pattern
+    tiles' positions and the blank's free region. Only pattern tile moves
+    cost 1, so tables for disjoint patterns can be added together.
+    The table is indexed by the positions read as base-n digits.
+    """
+    cells = size * size
+    k = len(pattern)
+    full = (1 << cells) - 1
+    not_first_col = sum(1 << pos for pos in range(cells) if pos % size != 0)
+    not_last_col = sum(1 << pos for pos in range(cells) if pos % size != size - 1)
+    neighbors = []
+    for pos in range(cells):
+        i, j = divmod(pos, size)
+        neighbors.append([ni * size + nj for ni, nj in ((i, j + 1), (i + 1, j), (i, j - 1), (i - 1, j))
+                          if 0 <= ni < size and 0 <= nj < size])
+    
+    def flood(start, occupied):
+        # Cells the blank can reach from start without moving a pattern tile
+        free = full & ~occupied
+        region = 1 << start
+        while True:
+            grown = region | ((region << 1) & not_first_col) | ((region >> 1) & not_last_col) \
+                    | (region << size) | (region >> size)
+            grown &= free
+            if grown == region:
+                return region
+            region = grown
+    
+    weights = [cells ** (k - 1 - i) for i in range(k)]
+    table = bytearray([255]) * (cells ** k)
+    visited = bytearray(cells ** (k + 1))
+    
+    start = [goal_tiles.index(tile) for tile in pattern]
+    occupied = sum(1 << pos for pos in start)
+    region = flood(goal_tiles.index(0), occupied)
+    rep = (region & -region).bit_length() - 1
+    index = sum(pos * weight for pos, weight in zip(start, weights))
+    table[index] = 0
+    visited[index * cells + rep] = 1
+    frontier = [(tuple(start), region)]
+    depth = 0
+    
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for positions, region in frontier:
+            occupied = 0
+            for pos in positions:
+                occupied |= 1 << pos
+            base = sum(pos * weight for pos, weight in zip(positions, weights))
+            for i, pos in enumerate(positions):
+                for target in neighbors[pos]:
+                    if not (region >> target) & 1:
+                        continue
+                    # Tile i slides into the blank's region; the blank ends up at pos
+                    new_region = flood(pos, (occupied | (1 << target)) & ~(1 << pos))
+                    new_rep = (new_region & -new_region).bit_length() - 1
+                    new_index = base + (target - pos) * weights[i]
+                    key = new_index * cells + new_rep
+                    if visited[key]:
+                        continue
+                    visited[key] = 1
+                    if table[new_index] == 255:
+                        table[new_index] = depth
+                    moved = positions[:i] + (target,) + positions[i + 1:]
+                    next_frontier.append((moved, new_region))
+        frontier = next_frontier
+    return table
+
+class PatternDatabase:
+    """
+    Disjoint additive pattern-database heuristic. Each table is built once,
+    written to a binary file and memory-mapped read-only afterwards, so
+    every process solving with the same goal shares one copy.
+    """
+    MAGIC = b"NPDB"
+    
+    def __init__(self, size, goal_tiles, patterns=None, directory="pdb_tables"):
+        self.size = size
+        cells = size * size
+        self.patterns = [tuple(p) for p in (patterns or default_patterns(size))]
+        covered = sorted(tile for pattern in self.patterns for tile in pattern)
+        if covered != list(range(1, cells)):
+            raise ValueError("Patterns must partition tiles 1..n-1 exactly once")
+        
+        self.group = [None] * cells       # tile -> pattern number
+        self.weight = [0] * cells         # tile -> base-n digit weight in its pattern
+        for g, pattern in enumerate(self.patterns):
+            for i, tile in enumerate(pattern):
+                self.group[tile] = g
+                self.weight[tile] = cells ** (len(pattern) - 1 - i)
+        
+        os.makedirs(directory, exist_ok=True)
+        goal_digest = hashlib.sha1(bytes(goal_tiles)).hexdigest()[:12]
+        self.maps = []
+        self.tables = []
+        for pattern in self.patterns:
+            name = f"pdb_{size}x{size}_{goal_digest}_{'-'.join(map(str, pattern))}.bin"
+            path = os.path.join(directory, name)
+            if not os.path.exists(path):
+                self.write_table(path, size, goal_tiles, pattern)
+            self.tables.append(self.map_table(path, size, goal_tiles, pattern))
+    
+    def write_table(self, path, size, goal_tiles, pattern):
+        table = build_pattern_table(size, goal_tiles, pattern)
+        header = self.MAGIC + struct.pack("<BB", size, len(pattern)) + bytes(pattern) + bytes(goal_tiles)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(table)
+        os.replace(tmp_path, path)  # Readers never see a half-written table
+    
+    def map_table(self, path, size, goal_tiles, pattern):
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = self.MAGIC + struct.pack("<BB", size, len(pattern)) + bytes(pattern) + bytes(goal_tiles)
+        if mapped[:len(header)] != header:
+            mapped.close()
+            raise ValueError(f"Pattern database {path} does not match this puzzle")
+        self.maps.append(mapped)
+        return memoryview(mapped)[len(header):]
+    
+    def pattern_index(self, tiles, g):
+        # Base-n digits are the pattern tiles' positions, most significant first
+        index = 0
+        for tile in self.patterns[g]:
+            index = index * len(tiles) + tiles.index(tile)
+        return index
+    
+    def __call__(self, tiles):
+        return sum(table[self.pattern_index(tiles, g)] for g, table in enumerate(self.tables))
+    
+    def update(self, h, tiles, from_pos, to_pos):
+        """Only the moved tile's pattern changes; re-read that one table."""
+        tile = tiles[to_pos]
+        g = self.group[tile]
+        table = self.tables[g]
+        index = self.pattern_index(tiles, g)
+        return h + table[index] - table[index - (to_pos - from_pos) * self.weight[tile]]
 
 class NPuzzle(StateSpaceTree):
+    DIRECTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+
+    def __init__(self, initial_state, goal_state=None):
+        super().__init__(initial_state, goal_state)
+        # Packed encoding: the board is one int holding cell_bits bits per
+        # cell in row-major order, and the blank's index is carried with it.
+        cells = self.size * self.size
+        self.cell_bits = max(1, (cells - 1).bit_length())
+        self.cell_mask = (1 << self.cell_bits) - 1
+        self.shifts = [pos * self.cell_bits for pos in range(cells)]
+        self.neighbors = []
+        for pos in range(cells):
+            i, j = divmod(pos, self.size)
+            adjacent = []
+            for di, dj in self.DIRECTIONS:
+                new_i, new_j = i + di, j + dj
+                if 0 <= new_i < self.size and 0 <= new_j < self.size:
+                    adjacent.append(new_i * self.size + new_j)
+            self.neighbors.append(tuple(adjacent))
+
+    def pack_tiles(self, tiles):
+        """Encode a flat row-major tile list as a packed int."""
+        packed = 0
+        for shift, val in zip(self.shifts, tiles):
+            packed |= val << shift
+        return packed
+
+    def pack_state(self, state):
+        """Encode a 2D board as (packed int, blank index)."""
+        tiles = [val for row in state for val in row]
+        return self.pack_tiles(tiles), tiles.index(0)
+
+    def unpack_state(self, packed):
+        """Decode a packed int back into a 2D board."""
+        flat = [(packed >> shift) & self.cell_mask for shift in self.shifts]
+        return [flat[i:i + self.size] for i in range(0, len(flat), self.size)]
+
+    def generate_packed_moves(self, packed, blank):
+        """
+        Children of a packed state as (packed, blank) pairs. Sliding a tile
+        into the blank is a two-term add/subtract on the int, so no board
+        is copied.
+        """
+        blank_shift = self.shifts[blank]
+        moves = []
+        for pos in self.neighbors[blank]:
+            shift = self.shifts[pos]
+            tile = (packed >> shift) & self.cell_mask
+            moves.append((packed + (tile << blank_shift) - (tile << shift), pos))
+        return moves
+
+    def encode_state(self, state):
+        return self.pack_state(state)
+
+    def decode_state(self, node):
+        return self.unpack_state(node[0])
+
+    def node_id(self, node):
+        return node[0]
+
+    def expand_node(self, node):
+        return self.generate_packed_moves(*node)
+
+    def solve(self, method="ida*", heuristic=None):
+        """
+        Find an optimal move sequence from initial_state to goal_state.
+        method is "ida*" (memory-bounded), "a*", or "bidirectional" (plain
+        BFS from both ends, no heuristic). heuristic "manhattan" is
+        Manhattan distance plus linear conflicts and "pdb" is
+        pattern_database() with its defaults; any object with __call__ and
+        update like ManhattanLinearConflict can be plugged in too. The
+        default is "pdb" for the 15-puzzle, where it solves random instances
+        in seconds once its tables are built (about a minute, then cached on
+        disk), and "manhattan" for every other size.
+        Returns (moves, stats), where moves lists the tiles slid into the
+        blank in order, or (None, stats) if the goal is unreachable.
+        """
+        if self.goal_state is None:
+            self.goal_state = canonical_goal_state(self.size)
+        goal_tiles = [val for row in self.goal_state for val in row]
+        if heuristic is None:
+            heuristic = "pdb" if self.size == 4 else "manhattan"
+        if heuristic == "manhattan":
+            heuristic = ManhattanLinearConflict(self.size, goal_tiles)
+        elif heuristic == "pdb":
+            heuristic = self.pattern_database()
+        
+        stats = {"method": method, "expanded": 0, "generated": 0, "cost": None}
+        started = time.perf_counter()
+        if not is_solvable(self.initial_state, self.goal_state, self.size):
+            moves = None
+        elif method == "bidirectional":
+            path, search_stats = self.bidirectional_search()
+            stats.update(search_stats)
+            moves = [(node[0] >> self.shifts[child[1]]) & self.cell_mask
+                     for node, child in zip(path, path[1:])]
+        elif method == "ida*":
+            moves = self.ida_star(heuristic, goal_tiles, stats)
+        elif method == "a*":
+            moves = self.a_star(heuristic, goal_tiles, stats)
+        else:
+            raise ValueError(f"Unknown search method: {method}")
+        stats["elapsed"] = time.perf_counter() - started
+        if moves is not None:
+            stats["cost"] = len(moves)
+        return moves, stats
+
+    def pattern_database(self, patterns=None, directory="pdb_tables"):
+        """Additive pattern databases for goal_state, built on first use."""
+        if self.goal_state is None:
+            self.goal_state = canonical_goal_state(self.size)
+        goal_tiles = [val for row in self.goal_state for val in row]
+        return PatternDatabase(self.size, goal_tiles, patterns, directory)
+
+    def a_star(self, heuristic, goal_tiles, stats):
+        """A* over packed states with a best-g table and parent pointers."""
+        tiles = [val for row in self.initial_state for val in row]
+        start = self.pack_tiles(tiles)
+        goal = self.pack_tiles(goal_tiles)
+        h = heuristic(tiles)
+        open_heap = [(h, h, 0, start, tiles.index(0))]
+        best_g = {start: 0}
+        parent = {start: None}
+        shifts, mask, neighbors = self.shifts, self.cell_mask, self.neighbors
+        max_open = 1
+        
+        while open_heap:
+            f, h, g, packed, blank = heapq.heappop(open_heap)
+            if g > best_g[packed]:
+                continue  # Stale entry, a cheaper path was found later
+            if packed == goal:
+                moves = []
+                while parent[packed] is not None:
+                    packed, tile = parent[packed]
+                    moves.append(tile)
+                stats["max_open"] = max_open
+                return moves[::-1]
+            
+            stats["expanded"] += 1
+            tiles = [(packed >> shift) & mask for shift in shifts]
+            blank_shift = shifts[blank]
+            for pos in neighbors[blank]:
+                tile = tiles[pos]
+                child = packed + (tile << blank_shift) - (tile << shifts[pos])
+                if g + 1 >= best_g.get(child, g + 2):
+                    continue
+                tiles[blank], tiles[pos] = tile, 0
+                child_h = heuristic.update(h, tiles, pos, blank)
+                tiles[blank], tiles[pos] = 0, tile
+                best_g[child] = g + 1
+                parent[child] = (packed, tile)
+                heapq.heappush(open_heap, (g + 1 + child_h, child_h, g + 1, child, pos))
+                stats["generated"] += 1
+            max_open = max(max_open, len(open_heap))
+        stats["max_open"] = max_open
+        return None
+
+    def ida_star(self, heuristic, goal_tiles, stats):
+        """Iterative-deepening A* with in-place moves on a single flat board."""
+        tiles = [val for row in self.initial_state for val in row]
+        neighbors = self.neighbors
+        update = heuristic.update
+        path = []
+        counts = [0, 0]  # expanded, generated
+        
+        def search(blank, prev, g, h, bound):
+            f = g + h
+            if f > bound:
+                return f
+            if h == 0 and tiles == goal_tiles:
+                return -1
+            counts[0] += 1
+            next_bound = float("inf")
+            for pos in neighbors[blank]:
+                if pos == prev:
+                    continue  # Never undo the previous move
+                tile = tiles[pos]
+                tiles[blank], tiles[pos] = tile, 0
+                child_h = update(h, tiles, pos, blank)
+                counts[1] += 1
+                if g + 1 + child_h > bound:
+                    # Over the bound: no need to pay for a call just to learn that
+                    tiles[blank], tiles[pos] = 0, tile
+                    if g + 1 + child_h < next_bound:
+                        next_bound = g + 1 + child_h
+                    continue
+                path.append(tile)
+                result = search(pos, blank, g + 1, child_h, bound)
+                if result == -1:
+                    return -1
+                path.pop()
+                tiles[blank], tiles[pos] = 0, tile
+                if result < next_bound:
+                    next_bound = result
+            return next_bound
+        
+        h = bound = heuristic(tiles)
+        iterations = 0
+        while True:
+            iterations += 1
+            result = search(tiles.index(0), None, 0, h, bound)
+            if result == -1 or result == float("inf"):
+                break
+            bound = result
+        stats["expanded"], stats["generated"] = counts
+        stats["iterations"] = iterations
+        return path if result == -1 else None
+
+    def enumerate_state_space(self, layer_dir=None, distance_path=None, memory_limit=1 << 30):
+        """
+        Breadth-first enumeration of every state reachable from
+        initial_state. States are Lehmer ranks of the flat board; the
+        visited set is a bit array over all n! ranks, memory-mapped from
+        layer_dir once it would exceed memory_limit bytes. Each layer is
+        streamed to layer_dir as 8-byte ranks (a temporary directory,
+        cleaned up afterwards, if none is given). If distance_path is set
+        a one-byte-per-rank depth table is written there, 255 marking
+        unreachable ranks. Returns {depth: count}.
+        """
+        cells = self.size * self.size
+        if cells > 20:
+            raise ValueError("Ranks of boards above 20 cells do not fit in 64 bits")
+        total = math.factorial(cells)
+        scratch = None
+        if layer_dir is None:
+            scratch = tempfile.TemporaryDirectory()
+            layer_dir = scratch.name
+        os.makedirs(layer_dir, exist_ok=True)
+        
+        bit_bytes = (total + 7) // 8
+        if bit_bytes > memory_limit:
+            visited = byte_table(os.path.join(layer_dir, "visited.bits"), bit_bytes, 0)
+        else:
+            visited = bytearray(bit_bytes)
+        distance = byte_table(distance_path, total, 255) if distance_path else None
+        
+        start = permutation_rank([val for row in self.initial_state for val in row])
+        visited[start >> 3] |= 1 << (start & 7)
+        if distance is not None:
+            distance[start] = 0
+        layer_path = os.path.join(layer_dir, "layer_000.bin")
+        with open(layer_path, 'wb') as f:
+            array('Q', [start]).tofile(f)
+        
+        histogram = {}
+        depth, count = 0, 1
+        chunk_size = 1 << 16
+        neighbors = self.neighbors
+        while count:
+            histogram[depth] = count
+            depth += 1
+            count = 0
+            next_path = os.path.join(layer_dir, f"layer_{depth:03d}.bin")
+            with open(layer_path, 'rb') as src, open(next_path, 'wb') as dst:
+                out = array('Q')
+                done = False
+                while not done:
+                    chunk = array('Q')
+                    try:
+                        chunk.fromfile(src, chunk_size)
+                    except EOFError:
+                        done = True  # The short final read still lands in chunk
+                    for rank in chunk:
+                        tiles = permutation_unrank(rank, cells)
+                        blank = tiles.index(0)
+                        for pos in neighbors[blank]:
+                            tiles[blank], tiles[pos] = tiles[pos], 0
+                            child = permutation_rank(tiles)
+                            tiles[pos], tiles[blank] = tiles[blank], 0
+                            if visited[child >> 3] & (1 << (child & 7)):
+                                continue
+                            visited[child >> 3] |= 1 << (child & 7)
+                            if distance is not None:
+                                distance[child] = depth
+                            out.append(child)
+                            count += 1
+                        if len(out) >= chunk_size:
+                            out.tofile(dst)
+                            out = array('Q')
+                out.tofile(dst)
+            if scratch is not None:
+                os.remove(layer_path)
+            layer_path = next_path
+        
+        if distance is not None:
+            distance.flush()
+            distance.close()
+        if isinstance(visited, mmap.mmap):
+            visited.close()
+        if scratch is not None:
+            scratch.cleanup()
+        return histogram
+
     def find_blank(self, state):
         for i, row in enumerate(state):
             for j, val in enumerate(row):
@@ -85,9 +880,8 @@ class NPuzzle(StateSpaceTree):
     def generate_moves(self, state):
         moves = []
         i, j = self.find_blank(state)
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
         
-        for di, dj in directions:
+        for di, dj in self.DIRECTIONS:
             new_i, new_j = i + di, j + dj
             if 0 <= new_i < self.size and 0 <= new_j < self.size:
                 new_state = [row[:] for row in state]
@@ -98,49 +892,44 @@ class NPuzzle(StateSpaceTree):
 
 def is_solvable(state, goal_state, size):
     """
-    Check if the puzzle is solvable using the correct logic for both odd and even sized puzzles.
+    Check if goal_state can be reached from state, for odd and even sized
+    puzzles and any goal layout. Every move swaps the blank with a tile, so
+    the permutation between the two boards and the blank's taxicab
+    distance must have the same parity.
     """
-    def get_inversions(state):
-        # Convert 2D state to 1D and remove blank (0)
-        flat = [num for row in state for num in row if num != 0]
-        inversions = 0
-        for i in range(len(flat)):
-            for j in range(i + 1, len(flat)):
-                if flat[i] > flat[j]:
-                    inversions += 1
-        return inversions
+    start = [num for row in state for num in row]
+    goal = [num for row in goal_state for num in row]
+    where = {tile: pos for pos, tile in enumerate(goal)}
+    perm = [where[tile] for tile in start]
+    
+    # Transpositions needed = sum over cycles of (cycle length - 1)
+    seen = [False] * len(perm)
+    swaps = 0
+    for i in range(len(perm)):
+        j, length = i, 0
+        while not seen[j]:
+            seen[j] = True
+            j = perm[j]
+            length += 1
+        swaps += max(length - 1, 0)
+    
+    blank_row, blank_col = divmod(start.index(0), size)
+    goal_row, goal_col = divmod(goal.index(0), size)
+    return swaps % 2 == (abs(blank_row - goal_row) + abs(blank_col - goal_col)) % 2
 
-    def get_blank_row(state):
-        # Get the row number (0-based) of the blank tile from the top
-        for i in range(size):
-            for j in range(size):
-                if state[i][j] == 0:
-                    return i
-        return -1
-
-    # Get inversions count
-    inversions = get_inversions(state)
-    
-    # Get blank position from top
-    blank_row = get_blank_row(state)
-
-    # For odd-sized puzzles (e.g., 3x3)
-    if size % 2 == 1:
-        return inversions % 2 == 0
-    # For even-sized puzzles (e.g., 4x4)
-    else:
-        blank_row_from_bottom = size - blank_row - 1
-        if blank_row_from_bottom % 2 == 0:
-            return inversions % 2 == 1
-        else:
-            return inversions % 2 == 0
+def canonical_goal_state(size):
+    """Goal with tiles 1..n-1 in row-major order and the blank last."""
+    goal_state = [[i + j * size for i in range(1, size + 1)] for j in range(size)]
+    goal_state[-1][-1] = 0  # Set last position to blank (0)
+    return goal_state
 
-def generate_random_state(size):
+def generate_random_state(size, goal_state=None):
     """
-    Generate a random solvable puzzle state.
+    Generate a random puzzle state that can reach goal_state
+    (the canonical goal by default).
     """
-    goal_state = [[i + j * size for i in range(1, size + 1)] for j in range(size)]
-    goal_state[-1][-1] = 0  # Set last position to blank (0)
+    if goal_state is None:
+        goal_state = canonical_goal_state(size)
     
     while True:
         # Create a random state
@@ -152,6 +941,44 @@ def generate_random_state(size):
         if is_solvable(state, goal_state, size):
             return state
 
+def generate_random_states(size, count, goal_state=None, seed=None):
+    """
+    Generate count random states that can reach goal_state, as an array
+    of shape (count, size, size) with the smallest unsigned dtype that
+    holds every tile (uint8 up to 16x16). Parity is computed for the whole
+    batch at once, and rows with the wrong parity have two tiles swapped.
+    That maps the unsolvable half one-to-one onto the solvable half, so
+    the result stays uniform and no rows are rejected.
+    """
+    if goal_state is None:
+        goal_state = canonical_goal_state(size)
+    cells = size * size
+    dtype = np.min_scalar_type(cells - 1)
+    goal = np.array([num for row in goal_state for num in row], dtype=dtype)
+    goal_pos = np.empty(cells, dtype=dtype)
+    goal_pos[goal] = np.arange(cells, dtype=dtype)
+    
+    rng = np.random.default_rng(seed)
+    states = rng.permuted(np.tile(np.arange(cells, dtype=dtype), (count, 1)), axis=1)
+    
+    # Parity of the permutation taking each state onto the goal
+    perm = goal_pos[states]
+    parity = np.zeros(count, dtype=bool)
+    for i in range(cells - 1):
+        parity ^= (np.count_nonzero(perm[:, i:i + 1] > perm[:, i + 1:], axis=1) & 1).astype(bool)
+    
+    blank = np.argmax(states == 0, axis=1)
+    goal_blank = int(goal_pos[0])
+    distance = np.abs(blank // size - goal_blank // size) + np.abs(blank % size - goal_blank % size)
+    wrong = parity != (distance & 1).astype(bool)
+    
+    # Swap the first two non-blank cells of each unsolvable row
+    rows = np.nonzero(wrong)[0]
+    first = np.where(blank[rows] == 0, 1, 0)
+    second = np.where(blank[rows] <= 1, 2, 1)
+    states[rows, first], states[rows, second] = states[rows, second], states[rows, first]
+    return states.reshape(count, size, size)
+
 def demo_n_puzzle():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_filename = f"puzzle_tree_{timestamp}.txt"
@@ -241,7 +1068,53 @@ def demo_n_puzzle():
             except ValueError:
                 print("Please enter a valid number")
         
-        puzzle.print_tree(max_depth, output_file)
+        # Enumeration walks all (n*n)! ranks: 9! is instant, 16! is terabytes
+        modes = "full/summary/gzip/enumerate" if size <= 3 else "full/summary/gzip"
+        mode = input(f"Tree output ({modes}) [full]: ").strip().lower() or "full"
+        if mode == "enumerate" and size > 3:
+            print(f"Enumerating every {size}x{size} state is not practical; printing the full tree instead")
+            mode = "full"
+        if mode == "enumerate":
+            tee_print("\nEnumerating the full reachable state space...", file=output_file)
+            try:
+                histogram = puzzle.enumerate_state_space()
+            except ValueError as e:
+                tee_print(f"Cannot enumerate the state space: {e}", file=output_file)
+            else:
+                tee_print(f"Total reachable states: {sum(histogram.values())}", file=output_file)
+                for depth, count in histogram.items():
+                    tee_print(f"States at depth {depth}: {count}", file=output_file)
+        elif mode == "summary":
+            workers = os.cpu_count() or 1
+            puzzle.print_tree(max_depth, sink=OutputSink(file=output_file, summary_only=True),
+                              workers=workers if workers > 1 else None)
+        elif mode == "gzip":
+            tree_filename = f"puzzle_tree_{timestamp}.tree.txt.gz"
+            with OutputSink(path=tree_filename, console=False, compress=True) as sink:
+                puzzle.print_tree(max_depth, sink=sink)
+            tee_print(f"\nTree written to: {tree_filename}", file=output_file)
+        else:
+            puzzle.print_tree(max_depth, output_file)
+        
+        if input("\nSearch for an optimal solution? (y/n): ").lower() == 'y':
+            method = input("Search method (ida*/a*/bidirectional) [ida*]: ").strip().lower() or "ida*"
+            while method not in ("ida*", "a*", "bidirectional"):
+                method = input("Please enter ida*, a* or bidirectional: ").strip().lower()
+            heuristic = "manhattan"
+            if method != "bidirectional" and size >= 4:
+                default = "y" if size == 4 else "n"
+                answer = input(f"Use pattern databases (slow first build)? (y/n) [{default}]: ").strip().lower() or default
+                if answer == 'y':
+                    heuristic = "pdb"
+            moves, stats = puzzle.solve(method, heuristic)
+            if moves is None:
+                tee_print("\nNo solution exists for the given goal state.", file=output_file)
+            else:
+                tee_print(f"\nOptimal solution ({stats['cost']} moves, tiles slid into the blank):", file=output_file)
+                tee_print(' '.join(map(str, moves)), file=output_file)
+                tee_print(f"Nodes expanded: {stats['expanded']}, generated: {stats['generated']}, "
+                          f"time: {stats['elapsed']:.2f}s", file=output_file)
+        
         tee_print(f"\nOutput has been saved to: {output_filename}", file=output_file)
 
 if __name__ == "__main__":
@@ -1,3 +1,8 @@
+import multiprocessing
+import os
+import random
+
+
 class NQueensStateSpaceTree:
     def __init__(self, n):
         self.n = n  # Size of the chessboard
@@ -36,15 +41,236 @@ class NQueensStateSpaceTree:
                 self.generate_tree(row + 1, board[:], depth + 1, f"Depth {depth}")
                 board[row] = -1  # Backtrack
 
+    def bitmask_search(self, counts_only=True, first_cols=None, on_solution=None, prefix=None):
+        """
+        Backtrack with columns and both diagonals held as bitmasks.
+        Returns (solution_count, nodes_at_depth), where nodes_at_depth[d]
+        equals the number of depth-d nodes generate_tree would store.
+        Nothing is added to self.tree; unless counts_only, solutions are
+        appended to self.solutions in the same order as generate_tree.
+        first_cols restricts the first row's columns, and on_solution, if
+        given, is called with each solution board (reused, so copy it).
+        prefix fixes the columns of the first rows and counts only below it.
+        """
+        n = self.n
+        full = (1 << n) - 1
+        nodes_at_depth = [0] * (n + 1)
+        nodes_at_depth[0] = 1
+        board = [-1] * n
+        start = (0, 0, 0, 0)
+        if prefix:
+            # Resume below a fixed placement of the first rows; only the
+            # nodes under it are counted
+            nodes_at_depth[0] = 0
+            cols = left = right = 0
+            for row, col in enumerate(prefix):
+                board[row] = col
+                bit = 1 << col
+                cols, left, right = cols | bit, ((left | bit) << 1) & full, (right | bit) >> 1
+            start = (len(prefix), cols, left, right)
+        if on_solution is None and not counts_only:
+            on_solution = lambda board: self.solutions.append(board[:])
+        track = on_solution is not None
+        first_mask = full if first_cols is None else sum(1 << col for col in first_cols)
+
+        def place(row, cols, left, right):
+            free = full & ~(cols | left | right)
+            if row == 0:
+                free &= first_mask
+            if not free:
+                return
+            nodes_at_depth[row + 1] += bin(free).count("1")
+            if row == n - 1:
+                if track:
+                    board[row] = free.bit_length() - 1
+                    on_solution(board)
+                return
+            while free:
+                bit = free & -free  # Lowest free column first, as generate_tree does
+                free ^= bit
+                if track:
+                    board[row] = bit.bit_length() - 1
+                place(row + 1, cols | bit, ((left | bit) << 1) & full, (right | bit) >> 1)
+
+        place(*start)
+        self.node_count = sum(nodes_at_depth)
+        return nodes_at_depth[n], nodes_at_depth
+
+    def safe_prefixes(self, rows):
+        """
+        Every safe placement of the first rows rows, in generate_tree
+        order, plus the node counts for depths 0..rows.
+        """
+        n = self.n
+        full = (1 << n) - 1
+        prefixes = []
+        nodes_at_depth = [0] * (rows + 1)
+        nodes_at_depth[0] = 1
+        board = []
+
+        def place(row, cols, left, right):
+            if row == rows:
+                prefixes.append(board[:])
+                return
+            free = full & ~(cols | left | right)
+            while free:
+                bit = free & -free
+                free ^= bit
+                nodes_at_depth[row + 1] += 1
+                board.append(bit.bit_length() - 1)
+                place(row + 1, cols | bit, ((left | bit) << 1) & full, (right | bit) >> 1)
+                board.pop()
+
+        place(0, 0, 0, 0)
+        return prefixes, nodes_at_depth
+
+    def parallel_search(self, workers=None, prefix_rows=None, counts_only=True):
+        """
+        Split the search into one subproblem per safe placement of the
+        first prefix_rows rows and solve them on a process pool. Counts,
+        per-depth nodes and (unless counts_only) solutions are merged in
+        prefix order, so they match bitmask_search exactly.
+        Returns (solution_count, nodes_at_depth).
+        """
+        n = self.n
+        if prefix_rows is None:
+            prefix_rows = 3
+        # Leave at least one row to the workers so their counts cover every solution
+        prefix_rows = max(0, min(prefix_rows, n - 1))
+        prefixes, prefix_nodes = self.safe_prefixes(prefix_rows)
+        nodes_at_depth = prefix_nodes + [0] * (n - prefix_rows)
+        total = 0
+        tasks = [(n, prefix, counts_only) for prefix in prefixes]
+        with multiprocessing.Pool(workers or os.cpu_count()) as pool:
+            for count, sub_nodes, solutions in pool.imap(search_prefix, tasks):
+                total += count
+                for d in range(prefix_rows + 1, n + 1):
+                    nodes_at_depth[d] += sub_nodes[d]
+                self.solutions.extend(solutions)
+        self.node_count = sum(nodes_at_depth)
+        return total, nodes_at_depth
+
+    def canonical_form(self, board):
+        """Smallest of the board's 8 rotations and reflections."""
+        n = self.n
+        forms = []
+        current = list(board)
+        for _ in range(4):
+            forms.append(tuple(current))
+            forms.append(tuple(n - 1 - col for col in current))  # Mirror left-right
+            rotated = [0] * n
+            for row, col in enumerate(current):
+                rotated[col] = n - 1 - row  # Rotate 90 degrees clockwise
+            current = rotated
+        return min(forms)
+
+    def symmetric_search(self):
+        """
+        Search only first-row columns in the left half, plus the middle
+        column for odd N, and mirror the counts for the right half. Only
+        solutions that are their own canonical form are kept, so
+        self.solutions holds one board per fundamental solution.
+        Returns (total_count, fundamental_count, nodes_at_depth).
+        """
+        n = self.n
+        half = n // 2
+        fundamental = []
+
+        def keep_if_canonical(board):
+            if tuple(board) == self.canonical_form(board):
+                fundamental.append(board[:])
+
+        # The canonical form has the smallest first column in its orbit,
+        # so it always lies in the searched half
+        total, nodes_at_depth = self.bitmask_search(first_cols=range(half), on_solution=keep_if_canonical)
+        total *= 2
+        nodes_at_depth = [2 * count for count in nodes_at_depth]
+        if n % 2 == 1:
+            middle, middle_nodes = self.bitmask_search(first_cols=[half], on_solution=keep_if_canonical)
+            total += middle
+            nodes_at_depth = [a + b for a, b in zip(nodes_at_depth, middle_nodes)]
+        nodes_at_depth[0] = 1
+
+        fundamental.sort()
+        self.solutions = fundamental
+        self.node_count = sum(nodes_at_depth)
+        return total, len(fundamental), nodes_at_depth
+
+    def print_summary(self, solution_count, nodes_at_depth, fundamental_count=None):
+        """Print the tree summary from counts alone."""
+        print("\nTree Generation Summary")
+        print("=" * 40)
+        print(f"Total nodes generated: {sum(nodes_at_depth)}")
+        for d, count in enumerate(nodes_at_depth):
+            print(f"Nodes at depth {d}: {count}")
+        print(f"\nSolutions found: {solution_count}")
+        if fundamental_count is not None:
+            print(f"Fundamental (unique up to symmetry) solutions: {fundamental_count}")
+
+    def iter_tree(self):
+        """
+        Lazily yield the search tree as (depth, board, parent) nodes, in the
+        same order and format as generate_tree stores them, keeping only
+        O(N) state. self.nodes_at_depth is updated as each node is yielded.
+        """
+        n = self.n
+        full = (1 << n) - 1
+        self.nodes_at_depth = [0] * (n + 1)
+        board = [-1] * n
+        self.nodes_at_depth[0] += 1
+        yield 0, board[:], "Root"
+
+        # Per row: columns still to try and the masks attacking that row
+        frees = [0] * n
+        cols, lefts, rights = [0] * n, [0] * n, [0] * n
+        frees[0] = full
+        row = 0
+        while row >= 0:
+            free = frees[row]
+            if not free:
+                board[row] = -1  # Backtrack
+                row -= 1
+                continue
+            bit = free & -free
+            frees[row] = free ^ bit
+            board[row] = bit.bit_length() - 1
+            self.nodes_at_depth[row + 1] += 1
+            yield row + 1, board[:], f"Depth {row}"
+            if row + 1 < n:
+                c = cols[row] | bit
+                l = ((lefts[row] | bit) << 1) & full
+                r = (rights[row] | bit) >> 1
+                row += 1
+                cols[row], lefts[row], rights[row] = c, l, r
+                frees[row] = full & ~(c | l | r)
+
+    def sample_tree(self, k, seed=None):
+        """Uniform sample of k tree nodes, drawn from iter_tree in one pass."""
+        rng = random.Random(seed)
+        sample = []
+        for i, node in enumerate(self.iter_tree()):
+            if i < k:
+                sample.append(node)
+            else:
+                j = rng.randrange(i + 1)  # Reservoir sampling
+                if j < k:
+                    sample[j] = node
+        return sample
+
     def print_tree(self):
-        """Print the search tree in the requested format."""
+        """
+        Print the search tree in the requested format. Uses self.tree if
+        generate_tree has been run, otherwise streams from iter_tree.
+        """
         print("Generating State Space Tree...")
         print("=" * 40)
         print("\nRoot State (Depth 0):")
         self.print_board([-1] * self.n)
 
         # Iterate through the tree and print each node
-        for depth, board, parent in self.tree:
+        nodes_at_depth = [0] * (self.n + 1)
+        for depth, board, parent in (self.tree or self.iter_tree()):
+            nodes_at_depth[depth] += 1
             if depth == 0:
                 continue  # Skip the root node here
             indent = "|   " * (depth - 1) + "+-- "
@@ -54,16 +280,19 @@ class NQueensStateSpaceTree:
         # Summary
         print("\nTree Generation Summary")
         print("=" * 40)
-        print(f"Total nodes generated: {self.node_count}")
+        print(f"Total nodes generated: {sum(nodes_at_depth)}")
         print(f"Nodes at depth 0: 1")
         for d in range(1, self.n + 1):
-            count = sum(1 for node in self.tree if node[0] == d)
-            print(f"Nodes at depth {d}: {count}")
+            print(f"Nodes at depth {d}: {nodes_at_depth[d]}")
 
-        # Display solutions
+        # Display solutions; when streaming, a second pass filters the leaves
         print("\nSolutions Found")
         print("=" * 40)
-        for i, solution in enumerate(self.solutions, 1):
+        if self.tree:
+            solutions = self.solutions
+        else:
+            solutions = (board for depth, board, parent in self.iter_tree() if depth == self.n)
+        for i, solution in enumerate(solutions, 1):
             print(f"Solution {i}:")
             self.print_board(solution)
 
@@ -75,15 +304,33 @@ class NQueensStateSpaceTree:
         print()  # Add spacing between boards
 
 
-# Input from the user
-try:
-    n = int(input("Enter the size of the chessboard (N): "))
-    if n < 1:
-        print("N must be greater than 0.")
-    else:
-        # Create an instance of the NQueensStateSpaceTree class
-        n_queens_tree = NQueensStateSpaceTree(n)
-        n_queens_tree.generate_tree()
-        n_queens_tree.print_tree()
-except ValueError:
-    print("Please enter a valid integer.")
+def search_prefix(task):
+    """Pool worker for NQueensStateSpaceTree.parallel_search."""
+    n, prefix, counts_only = task
+    tree = NQueensStateSpaceTree(n)
+    count, nodes_at_depth = tree.bitmask_search(counts_only, prefix=prefix)
+    return count, nodes_at_depth, tree.solutions
+
+
+if __name__ == "__main__":
+    # Input from the user
+    try:
+        n = int(input("Enter the size of the chessboard (N): "))
+        if n < 1:
+            print("N must be greater than 0.")
+        else:
+            # Create an instance of the NQueensStateSpaceTree class
+            n_queens_tree = NQueensStateSpaceTree(n)
+            if input("Print the full search tree? (y/n): ").lower() == 'y':
+                n_queens_tree.print_tree()  # Streams nodes, memory stays O(N)
+            elif input("Use symmetry reduction? (y/n): ").lower() == 'y':
+                total, fundamental, nodes_at_depth = n_queens_tree.symmetric_search()
+                n_queens_tree.print_summary(total, nodes_at_depth, fundamental)
+            elif (os.cpu_count() or 1) > 1 and n >= 10:
+                # Counts only, split across every core
+                n_queens_tree.print_summary(*n_queens_tree.parallel_search())
+            else:
+                # Counts only: nothing is materialized, so large N stays feasible
+                n_queens_tree.print_summary(*n_queens_tree.bitmask_search())
+    except ValueError:
+        print("Please enter a valid integer.")
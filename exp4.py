@@ -1,167 +1,798 @@
+import hashlib
 import heapq
+import multiprocessing
+import multiprocessing.util
+import os
+import pickle
 import random
+import struct
+from array import array
+from functools import reduce
+from math import gcd
+from multiprocessing import shared_memory
+import numpy as np
 import networkx as nx
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 
-def a_star_water_jug(jug1, jug2, target):
-    def heuristic(state):
-        return abs(state[0] - target) + abs(state[1] - target)
+def jug_moves(state, capacities):
+    """Every state one fill, empty or pour away from state."""
+    moves = []
+    for i, amount in enumerate(state):
+        if amount < capacities[i]:
+            moves.append(state[:i] + (capacities[i],) + state[i + 1:])  # Fill jug i
+        if amount > 0:
+            moves.append(state[:i] + (0,) + state[i + 1:])  # Empty jug i
+            for j, other in enumerate(state):
+                poured = min(amount, capacities[j] - other)
+                if j != i and poured > 0:  # Pour jug i into jug j
+                    move = list(state)
+                    move[i] -= poured
+                    move[j] += poured
+                    moves.append(tuple(move))
+    return moves
+
+def pour_steps(x, y, target):
+    """
+    Length of the repeat "fill x, pour x into y, empty y when full" run
+    until a jug holds target. With k fills and m empties, k*x - m*y == target;
+    the smallest such k comes from a modular inverse. Ending in x takes
+    2(k + m) - 2 steps, ending in y takes 2(k + m).
+    Assumes 0 < target <= max(x, y), target not x or y, gcd | target.
+    """
+    g = gcd(x, y)
+    cycle = y // g
+    k = (target // g) * pow(x // g, -1, cycle) % cycle if cycle > 1 else 0
+    if k == 0:
+        k = cycle
+    m = (k * x - target) // y
+    steps = []
+    if target < x and m >= 1:
+        steps.append(2 * (k + m) - 2)
+    if target <= y and m >= 0:
+        steps.append(2 * (k + m))
+    return min(steps) if steps else None
+
+def water_jug_min_steps(jug1, jug2, target):
+    """
+    Optimal number of operations until either jug holds target, in
+    O(log n) without searching. Returns (steps, first) where first is the
+    jug (1 or 2) the optimal run keeps refilling, or (None, None) if no
+    jug can ever hold target.
+    """
+    if target < 0:
+        return None, None
+    if target == 0:
+        return 0, None
+    if target == jug1:
+        return 1, 1
+    if target == jug2:
+        return 1, 2
+    if target > max(jug1, jug2) or min(jug1, jug2) == 0 or target % gcd(jug1, jug2):
+        return None, None
+    forward, backward = pour_steps(jug1, jug2, target), pour_steps(jug2, jug1, target)
+    if backward is None or (forward is not None and forward <= backward):
+        return forward, 1
+    return backward, 2
+
+def water_jug_path(jug1, jug2, target):
+    """
+    Optimal state sequence from (0, 0) until either jug holds target,
+    generated directly from the winning fill-and-pour strategy.
+    Returns (path, steps) or (None, None).
+    """
+    steps, first = water_jug_min_steps(jug1, jug2, target)
+    if steps is None:
+        return None, None
+    if first is None:
+        return [(0, 0)], 0
     
-    start = (0, 0)
-    queue = [(heuristic(start), 0, start, [])]
-    visited = set()
-    total_cost = 0
+    # Simulate with the refilled jug as x, then orient states as (jug1, jug2)
+    x, y = (jug1, jug2) if first == 1 else (jug2, jug1)
+    a, b = x, 0
+    states = [(0, 0), (a, b)]
+    while a != target and b != target:
+        poured = min(a, y - b)
+        a, b = a - poured, b + poured
+        states.append((a, b))
+        if a == target or b == target:
+            break
+        if a == 0:
+            a = x
+            states.append((a, b))
+        if b == y:
+            b = 0
+            states.append((a, b))
+    if first == 2:
+        states = [(b, a) for a, b in states]
+    return states, steps
+
+def a_star_water_jugs(capacities, target, quiet=True):
+    """
+    A* over states holding one amount per jug, for any number of jugs.
+    The goal is any jug holding target. Every move costs 1, so the
+    heuristic (0 at a goal, 1 elsewhere) is admissible and consistent and
+    the returned cost is optimal. Heap entries carry only the state; the
+    path is rebuilt from a parent map. Returns (path, cost) or (None, None).
+    Impossible targets are rejected by the gcd test and two jugs are
+    answered by water_jug_path, so only three or more jugs are searched.
+    """
+    capacities = tuple(capacities)
+    # Any jug only ever holds multiples of the gcd, never more than the largest jug
+    g = reduce(gcd, capacities)
+    if target < 0 or target > max(capacities) or (g and target % g):
+        return None, None
+    if len(capacities) == 2:
+        path, cost = water_jug_path(*capacities, target)
+        if not quiet:
+            for step, (a, b) in enumerate(path):
+                print(f"Current State: Jug1 = {a}, Jug2 = {b}, Cost = {step}")
+            print(f"\nTotal Cost of Operations: {cost}")
+        return path, cost
+    
+    def heuristic(state):
+        return 0 if target in state else 1
     
-    print("\nRules of the Water Jug Problem:")
-    print("1. You can fill a jug to its full capacity.")
-    print("2. You can empty a jug completely.")
-    print("3. You can transfer water from one jug to another until the receiving jug is full or the pouring jug is empty.")
-    print("\nSolution Steps:")
+    start = (0,) * len(capacities)
+    queue = [(heuristic(start), 0, start)]
+    best_cost = {start: 0}
+    parent = {start: None}
     
     while queue:
-        _, cost, (a, b), path = heapq.heappop(queue)
-        if (a, b) in visited:
-            continue
-        visited.add((a, b))
-        path = path + [(a, b)]
-        total_cost = cost
-        print(f"Current State: Jug1 = {a}, Jug2 = {b}, Cost = {cost}")
+        _, cost, state = heapq.heappop(queue)
+        if cost > best_cost[state]:
+            continue  # Stale entry, state was reached more cheaply
+        if not quiet:
+            jugs = ", ".join(f"Jug{i + 1} = {amount}" for i, amount in enumerate(state))
+            print(f"Current State: {jugs}, Cost = {cost}")
         
-        if a == target or b == target:
-            print(f"\nTotal Cost of Operations: {total_cost}")
-            return path, total_cost
-        
-        possible_moves = [
-            (jug1, b),  # Fill jug1
-            (a, jug2),  # Fill jug2
-            (0, b),     # Empty jug1
-            (a, 0),     # Empty jug2
-            (a - min(a, jug2 - b), b + min(a, jug2 - b)),  # Pour jug1 to jug2
-            (a + min(b, jug1 - a), b - min(b, jug1 - a))   # Pour jug2 to jug1
-        ]
+        if target in state:
+            if not quiet:
+                print(f"\nTotal Cost of Operations: {cost}")
+            path = []
+            while state is not None:
+                path.append(state)
+                state = parent[state]
+            return path[::-1], cost
         
-        for move in possible_moves:
-            if move not in visited:
-                heapq.heappush(queue, (cost + heuristic(move), cost + 1, move, path))
+        for move in jug_moves(state, capacities):
+            if cost + 1 < best_cost.get(move, cost + 2):
+                best_cost[move] = cost + 1
+                parent[move] = state
+                heapq.heappush(queue, (cost + 1 + heuristic(move), cost + 1, move))
     return None, None
 
-def generate_sparse_graph(n=20, density=0.2):
-    # Create an empty graph
+def a_star_water_jug(jug1, jug2, target, quiet=False):
+    if not quiet:
+        print("\nRules of the Water Jug Problem:")
+        print("1. You can fill a jug to its full capacity.")
+        print("2. You can empty a jug completely.")
+        print("3. You can transfer water from one jug to another until the receiving jug is full or the pouring jug is empty.")
+        print("\nSolution Steps:")
+    return a_star_water_jugs((jug1, jug2), target, quiet)
+
+def generate_sparse_csr(n=20, density=0.2, seed=None, num_edges=None):
+    """
+    Same graphs as generate_sparse_graph (random spanning path for
+    connectivity, then random extra edges up to the target density,
+    weights 1-20) emitted directly as CSR arrays, with each undirected
+    edge stored in both directions. Edges are sampled and deduplicated in
+    NumPy batches keyed by lo * n + hi. num_edges overrides density.
+    Returns (indptr, indices, weights).
+    """
+    rng = np.random.default_rng(seed)
+    max_edges = n * (n - 1) // 2
+    target_edges = int(n * (n-1) * density / 2) if num_edges is None else num_edges
+    target_edges = min(max(target_edges, n - 1), max_edges)
+    
+    # Ensure graph is connected first
+    nodes = rng.permutation(n).astype(np.int64)
+    u, v = nodes[:-1], nodes[1:]
+    keys = np.sort(np.minimum(u, v) * n + np.maximum(u, v))
+    
+    needed = target_edges - len(keys)
+    if needed > 0 and target_edges * 2 > max_edges:
+        # Dense: choose directly among every remaining pair
+        lo, hi = np.triu_indices(n, 1)
+        candidates = lo.astype(np.int64) * n + hi
+        candidates = candidates[~np.isin(candidates, keys, assume_unique=True)]
+        keys = np.sort(np.concatenate((keys, rng.choice(candidates, needed, replace=False))))
+    while needed > 0 and target_edges * 2 <= max_edges:
+        # Oversample for self-loops and duplicates, then keep only new pairs
+        batch = int(needed * max_edges / (max_edges - len(keys)) * 1.1) + 16
+        u = rng.integers(0, n, batch, dtype=np.int64)
+        v = rng.integers(0, n, batch, dtype=np.int64)
+        u, v = u[u != v], v[u != v]
+        candidates = np.sort(np.minimum(u, v) * n + np.maximum(u, v))
+        candidates = candidates[np.concatenate(([True], candidates[1:] != candidates[:-1]))]
+        candidates = candidates[~np.isin(candidates, keys, assume_unique=True)]
+        if len(candidates) > needed:
+            candidates = rng.choice(candidates, needed, replace=False)
+        keys = np.sort(np.concatenate((keys, candidates)))
+        needed = target_edges - len(keys)
+    
+    lo, hi = np.divmod(keys, n)
+    weight = rng.integers(1, 21, len(keys), dtype=np.int32)
+    source = np.concatenate((lo, hi))
+    order = np.argsort(source)
+    index_type = np.int32 if n < 2**31 else np.int64
+    indices = np.concatenate((hi, lo))[order].astype(index_type)
+    weights = np.concatenate((weight, weight))[order]
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(source, minlength=n), out=indptr[1:])
+    return indptr, indices, weights
+
+def csr_to_networkx(indptr, indices, weights):
+    """networkx Graph of a CSR graph, for display_graph."""
     G = nx.Graph()
-    G.add_nodes_from(range(n))
+    G.add_nodes_from(range(len(indptr) - 1))
+    source = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    G.add_weighted_edges_from(zip(source.tolist(), indices.tolist(), weights.tolist()))
+    return G
+
+def generate_sparse_graph(n=20, density=0.2, seed=None):
+    """Dict-of-dicts and networkx views of generate_sparse_csr."""
+    indptr, indices, weights = generate_sparse_csr(n, density, seed)
+    graph_dict = {i: dict(zip(indices[indptr[i]:indptr[i+1]].tolist(), weights[indptr[i]:indptr[i+1]].tolist()))
+                  for i in range(n)}
+    return graph_dict, csr_to_networkx(indptr, indices, weights)
+
+class Adjacency:
+    """
+    A CSR graph converted once to plain lists. Searches index lists much
+    faster than NumPy arrays, so repeated queries should share one
+    Adjacency rather than pay the O(E) conversion on every call.
+    """
+    def __init__(self, indptr, indices, weights):
+        self.indptr = indptr.tolist()
+        self.indices = indices.tolist()
+        self.weights = weights.tolist()
     
-    # Generate edges until we reach desired density
-    target_edges = int(n * (n-1) * density / 2)
-    edges_added = 0
+    def __len__(self):
+        return len(self.indptr) - 1
     
-    # Ensure graph is connected first
-    nodes = list(range(n))
-    random.shuffle(nodes)
-    for i in range(len(nodes)-1):
-        weight = random.randint(1, 20)
-        G.add_edge(nodes[i], nodes[i+1], weight=weight)
-        edges_added += 1
-    
-    # Add random edges until desired density
-    while edges_added < target_edges:
-        u, v = random.sample(range(n), 2)
-        if not G.has_edge(u, v):
-            weight = random.randint(1, 20)
-            G.add_edge(u, v, weight=weight)
-            edges_added += 1
-    
-    # Convert to dictionary format
-    graph_dict = {i: {} for i in range(n)}
-    for (u, v, w) in G.edges.data('weight'):
-        graph_dict[u][v] = w
-        graph_dict[v][u] = w
-    
-    return graph_dict, G
-
-def a_star_sparse_graph(graph, start, goal):
-    def heuristic(node):
-        return abs(goal - node)
-    
-    queue = [(heuristic(start), 0, start, [])]
-    visited = set()
+    def neighbors(self, node):
+        start, end = self.indptr[node], self.indptr[node+1]
+        return zip(self.indices[start:end], self.weights[start:end])
+
+def prepare_graph(graph):
+    """Dict graphs and Adjacency objects as they are; CSR tuples as an Adjacency."""
+    if isinstance(graph, (dict, Adjacency)):
+        return graph
+    return Adjacency(*graph)
+
+def graph_neighbors(graph):
+    """
+    (node count, neighbors) for a dict-of-dicts graph, an Adjacency or an
+    (indptr, indices, weights) CSR tuple; neighbors(node) yields
+    (neighbor, weight) pairs. Nodes are 0..n-1 either way.
+    """
+    graph = prepare_graph(graph)
+    if isinstance(graph, dict):
+        return len(graph), lambda node: graph[node].items()
+    return len(graph), graph.neighbors
+
+def dijkstra_distances(graph, source):
+    """Exact distance from source to every node (inf if unreachable)."""
+    n, neighbors = graph_neighbors(graph)
+    distance = [float('inf')] * n
+    distance[source] = 0
+    queue = [(0, source)]
+    while queue:
+        cost, node = heapq.heappop(queue)
+        if cost > distance[node]:
+            continue  # Stale entry, node already settled cheaper
+        for neighbor, weight in neighbors(node):
+            if cost + weight < distance[neighbor]:
+                distance[neighbor] = cost + weight
+                heapq.heappush(queue, (cost + weight, neighbor))
+    return distance
+
+class Landmarks:
+    """
+    ALT preprocessing for an undirected graph: exact distances from a few
+    landmarks picked farthest-first. By the triangle inequality
+    |d(L, goal) - d(L, node)| never overestimates d(node, goal), so the
+    max over landmarks is an admissible, consistent A* heuristic.
+    """
+    def __init__(self, graph, count=4, seed=None):
+        # Keep the prepared graph so a_star_sparse_graph can reuse it
+        self.source = graph
+        self.graph = graph = prepare_graph(graph)
+        n = len(graph)
+        self.nodes = []
+        self.distances = []
+        nearest = dijkstra_distances(graph, random.Random(seed).randrange(n))
+        for _ in range(min(count, n)):
+            # Next landmark is the node farthest from those chosen so far
+            landmark = max(range(n), key=lambda node: nearest[node] if nearest[node] < float('inf') else -1)
+            distance = dijkstra_distances(graph, landmark)
+            self.nodes.append(landmark)
+            self.distances.append(distance)
+            nearest = distance if len(self.nodes) == 1 else [min(a, b) for a, b in zip(nearest, distance)]
+    
+    def heuristic(self, goal):
+        pairs = [(distance[goal], distance) for distance in self.distances if distance[goal] < float('inf')]
+        def estimate(node):
+            return max((abs(to_goal - distance[node]) for to_goal, distance in pairs), default=0)
+        return estimate
+
+def a_star_sparse_graph(graph, start, goal, landmarks=None, stats=None):
+    """
+    A* on a dict, Adjacency or CSR graph. With landmarks the ALT heuristic
+    guides the search; without it the heuristic is 0 (plain Dijkstra),
+    which is the only admissible choice node IDs allow. Stale heap entries
+    are skipped on pop and the path is rebuilt from a predecessor array.
+    For repeated CSR queries pass prepare_graph(csr), or the same CSR the
+    landmarks were built on, so the lists are not rebuilt per call.
+    Returns (path, cost) or (None, None).
+    """
+    if landmarks is not None and graph is landmarks.source:
+        graph = landmarks.graph
+    n, neighbors = graph_neighbors(graph)
+    heuristic = landmarks.heuristic(goal) if landmarks else (lambda node: 0)
+    best_cost = [float('inf')] * n
+    parent = array('q', [-1]) * n
+    best_cost[start] = 0
+    queue = [(heuristic(start), 0, start)]
+    expanded = 0
     
     while queue:
-        _, cost, node, path = heapq.heappop(queue)
-        if node in visited:
+        _, cost, node = heapq.heappop(queue)
+        if cost > best_cost[node]:
             continue
-        visited.add(node)
-        path = path + [node]
+        expanded += 1
         
         if node == goal:
-            return path, cost
+            path = []
+            while node != -1:
+                path.append(node)
+                node = parent[node]
+            if stats is not None:
+                stats["expanded"] = expanded
+            return path[::-1], cost
         
-        for neighbor, weight in graph[node].items():
-            if neighbor not in visited:
-                heapq.heappush(queue, (cost + weight + heuristic(neighbor), cost + weight, neighbor, path))
+        for neighbor, weight in neighbors(node):
+            new_cost = cost + weight
+            if new_cost < best_cost[neighbor]:
+                best_cost[neighbor] = new_cost
+                parent[neighbor] = node
+                heapq.heappush(queue, (new_cost + heuristic(neighbor), new_cost, neighbor))
+    
+    if stats is not None:
+        stats["expanded"] = expanded
     return None, None
 
-def display_graph(G, shortest_path, start, goal):
-    # Dramatically increased figure size for maximum spacing
-    plt.figure(figsize=(20, 16))
-    
-    # Increased k parameter significantly for maximum node separation
-    pos = nx.spring_layout(G, k=5.0, iterations=200, seed=42)
-    
-    # Draw the base graph with increased spacing and sizes
-    nx.draw(G, pos, with_labels=True, 
-            node_color='lightblue',
-            edge_color='gray',
-            node_size=1200,        # Larger nodes
-            font_size=14,          # Larger node labels
-            width=1.5,             # Slightly thicker edges
-            alpha=0.9)             # Slightly more opaque
-    
-    # Draw edge weights with more space and larger font
-    edge_labels = nx.get_edge_attributes(G, 'weight')
-    nx.draw_networkx_edge_labels(G, pos, 
-                                edge_labels=edge_labels,
-                                font_size=12,      # Larger weight labels
-                                label_pos=0.5,     # Centered on edges
-                                bbox=dict(facecolor='white', 
-                                        edgecolor='none',
-                                        alpha=0.7,  # Background for weight labels
-                                        pad=2))
+class ContractionHierarchy:
+    """
+    Contraction hierarchy for an undirected dict or CSR graph. Nodes are
+    contracted in edge-difference order; a shortcut u-w (through v) is
+    added only when a bounded witness search finds no path at most as
+    short that avoids v. Queries run Dijkstra upward from both ends and
+    unpack shortcuts through their middle node, giving the same optimal
+    cost as plain Dijkstra.
+    The upward graph is kept in CSR form (edges from each node to
+    higher-ranked neighbours, with the shortcut middle or -1).
+    """
+    MAGIC = b"NPCH"
+    
+    def __init__(self, graph, witness_limit=200):
+        n, neighbors = graph_neighbors(graph)
+        self.n = n
+        self.witness_limit = witness_limit
+        adjacency = [{} for _ in range(n)]
+        middle = {}  # (lo, hi) node pair -> contracted middle node of a shortcut
+        for node in range(n):
+            for neighbor, weight in neighbors(node):
+                if neighbor != node and weight < adjacency[node].get(neighbor, float('inf')):
+                    adjacency[node][neighbor] = weight
+                    adjacency[neighbor][node] = weight
+        
+        rank = [-1] * n
+        contracted_neighbors = [0] * n
+        queue = [(self.priority(adjacency, node, contracted_neighbors), node) for node in range(n)]
+        heapq.heapify(queue)
+        up = [{} for _ in range(n)]
+        order = 0
+        
+        while queue:
+            _, node = heapq.heappop(queue)
+            if rank[node] != -1:
+                continue
+            # Lazy update: re-queue if the priority grew since it was pushed
+            shortcuts = self.shortcuts(adjacency, node)
+            current = len(shortcuts) - len(adjacency[node]) + contracted_neighbors[node]
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, node))
+                continue
+            
+            rank[node] = order
+            order += 1
+            remaining = adjacency[node]
+            for neighbor, weight in remaining.items():
+                up[node][neighbor] = (weight, middle.get((min(node, neighbor), max(node, neighbor)), -1))
+            for u, v, weight in shortcuts:
+                if weight < adjacency[u].get(v, float('inf')):
+                    adjacency[u][v] = adjacency[v][u] = weight
+                    middle[(min(u, v), max(u, v))] = node
+            for neighbor in remaining:
+                del adjacency[neighbor][node]
+                contracted_neighbors[neighbor] += 1
+            adjacency[node] = {}
+        
+        self.rank = np.array(rank, dtype=np.int32)
+        self.up_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum([len(edges) for edges in up], out=self.up_indptr[1:])
+        self.up_indices = np.array([v for edges in up for v in edges], dtype=np.int32)
+        self.up_weights = np.array([edge[0] for edges in up for edge in edges.values()], dtype=np.float64)
+        self.up_middle = np.array([edge[1] for edges in up for edge in edges.values()], dtype=np.int32)
+        self.prepare()
+    
+    def witness_distances(self, adjacency, source, skip, targets, max_cost):
+        """
+        Dijkstra from source avoiding skip, stopped once every target is
+        settled, past max_cost, or after witness_limit settled nodes.
+        """
+        distance = {source: 0}
+        queue = [(0, source)]
+        unsettled = set(targets)
+        settled = 0
+        while queue and unsettled and settled < self.witness_limit:
+            cost, node = heapq.heappop(queue)
+            if cost > distance[node]:
+                continue
+            if cost > max_cost:
+                break
+            settled += 1
+            unsettled.discard(node)
+            for neighbor, weight in adjacency[node].items():
+                if neighbor != skip and cost + weight < distance.get(neighbor, float('inf')):
+                    distance[neighbor] = cost + weight
+                    heapq.heappush(queue, (cost + weight, neighbor))
+        return distance
+    
+    def shortcuts(self, adjacency, node):
+        """Shortcuts (u, w, weight) needed to keep distances when node is removed."""
+        edges = list(adjacency[node].items())
+        needed = []
+        for i, (u, weight_u) in enumerate(edges[:-1]):
+            rest = edges[i+1:]
+            max_cost = weight_u + max(weight for _, weight in rest)
+            witness = self.witness_distances(adjacency, u, node, [w for w, _ in rest], max_cost)
+            for w, weight_w in rest:
+                if witness.get(w, float('inf')) > weight_u + weight_w:
+                    needed.append((u, w, weight_u + weight_w))
+        return needed
+    
+    def priority(self, adjacency, node, contracted_neighbors):
+        return len(self.shortcuts(adjacency, node)) - len(adjacency[node]) + contracted_neighbors[node]
+    
+    def prepare(self):
+        """Plain-list copies of the upward graph for fast queries."""
+        self.rank_list = self.rank.tolist()
+        self.indptr_list = self.up_indptr.tolist()
+        self.indices_list = self.up_indices.tolist()
+        self.weights_list = self.up_weights.tolist()
+        self.middle_list = self.up_middle.tolist()
+    
+    def upward(self, node):
+        start, end = self.indptr_list[node], self.indptr_list[node+1]
+        return zip(self.indices_list[start:end], self.weights_list[start:end])
+    
+    def edge_middle(self, a, b):
+        lo, hi = (a, b) if self.rank_list[a] < self.rank_list[b] else (b, a)
+        start, end = self.indptr_list[lo], self.indptr_list[lo+1]
+        return self.middle_list[start + self.indices_list[start:end].index(hi)]
+    
+    def unpack(self, nodes):
+        """Replace every shortcut along nodes by the original edges it stands for."""
+        path = [nodes[0]]
+        stack = [(a, b) for a, b in zip(nodes[-2::-1], nodes[:0:-1])]
+        while stack:
+            a, b = stack.pop()
+            mid = self.edge_middle(a, b)
+            if mid == -1:
+                path.append(b)
+            else:
+                stack.append((mid, b))
+                stack.append((a, mid))
+        return path
+    
+    def query(self, start, goal):
+        """Bidirectional upward Dijkstra. Returns (path, cost) or (None, None)."""
+        distance = ({start: 0}, {goal: 0})
+        parent = ({start: None}, {goal: None})
+        queues = ([(0, start)], [(0, goal)])
+        best, meet = float('inf'), None
+        
+        while queues[0] or queues[1]:
+            # Expand the side with the cheaper frontier; stop when neither can improve best
+            side = 0 if queues[0] and (not queues[1] or queues[0][0][0] <= queues[1][0][0]) else 1
+            cost, node = heapq.heappop(queues[side])
+            if cost >= best:
+                queues[side].clear()
+                continue
+            if cost > distance[side][node]:
+                continue
+            other = distance[1 - side].get(node)
+            if other is not None and cost + other < best:
+                best, meet = cost + other, node
+            for neighbor, weight in self.upward(node):
+                if cost + weight < distance[side].get(neighbor, float('inf')):
+                    distance[side][neighbor] = cost + weight
+                    parent[side][neighbor] = node
+                    heapq.heappush(queues[side], (cost + weight, neighbor))
+        
+        if meet is None:
+            return None, None
+        nodes = []
+        node = meet
+        while node is not None:
+            nodes.append(node)
+            node = parent[0][node]
+        nodes.reverse()
+        node = parent[1][meet]
+        while node is not None:
+            nodes.append(node)
+            node = parent[1][node]
+        best = int(best) if best == int(best) else best
+        return self.unpack(nodes), best
+    
+    def save(self, filename):
+        """Header (magic, node and upward-edge counts) then the raw arrays."""
+        with open(filename, 'wb') as f:
+            f.write(self.MAGIC + struct.pack("<qq", self.n, len(self.up_indices)))
+            for part in (self.rank, self.up_indptr, self.up_indices, self.up_weights, self.up_middle):
+                part.tofile(f)
+    
+    @classmethod
+    def load(cls, filename):
+        with open(filename, 'rb') as f:
+            if f.read(4) != cls.MAGIC:
+                raise ValueError(f"{filename} is not a contraction hierarchy file")
+            n, m = struct.unpack("<qq", f.read(16))
+            hierarchy = cls.__new__(cls)
+            hierarchy.n = n
+            hierarchy.rank = np.fromfile(f, dtype=np.int32, count=n)
+            hierarchy.up_indptr = np.fromfile(f, dtype=np.int64, count=n + 1)
+            hierarchy.up_indices = np.fromfile(f, dtype=np.int32, count=m)
+            hierarchy.up_weights = np.fromfile(f, dtype=np.float64, count=m)
+            hierarchy.up_middle = np.fromfile(f, dtype=np.int32, count=m)
+        hierarchy.prepare()
+        return hierarchy
+
+def dict_to_csr(graph):
+    """(indptr, indices, weights) arrays of a dict-of-dicts graph on nodes 0..n-1."""
+    n = len(graph)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum([len(graph[node]) for node in range(n)], out=indptr[1:])
+    indices = np.fromiter((v for node in range(n) for v in graph[node]), dtype=np.int32, count=indptr[-1])
+    weights = np.fromiter((w for node in range(n) for w in graph[node].values()), dtype=np.float64, count=indptr[-1])
+    return indptr, indices, weights
+
+SHARED_GRAPH = None  # Per-worker memoryviews over the shared CSR arrays, or the attach error
+
+def attach_shared_graph(spec):
+    """
+    Pool initializer: map the shared CSR blocks without copying them.
+    spec lists (block name, type code, element count) per array. A failure
+    is kept and raised by the first task, because an initializer that
+    raises makes the pool respawn workers forever.
+    """
+    global SHARED_GRAPH
+    blocks = []
+    try:
+        for name, code, count in spec:
+            blocks.append(shared_memory.SharedMemory(name=name))
+        # Blocks are at least one byte, so cut each view to its real length
+        views = [block.buf[:count * np.dtype(code).itemsize].cast(code) for block, (_, code, count) in zip(blocks, spec)]
+    except Exception as error:
+        for block in blocks:
+            block.close()
+        SHARED_GRAPH = error
+        return
+    SHARED_GRAPH = (blocks, views)
+    multiprocessing.util.Finalize(None, detach_shared_graph, exitpriority=10)
+
+def detach_shared_graph():
+    """Release the views and close this worker's handles when it exits."""
+    global SHARED_GRAPH
+    if isinstance(SHARED_GRAPH, tuple):
+        blocks, views = SHARED_GRAPH
+        for view in views:
+            view.release()
+        for block in blocks:
+            block.close()
+    SHARED_GRAPH = None
+
+def solve_source_group(task):
+    """
+    Pool worker: one Dijkstra from source over the shared graph, stopped
+    once every goal is settled. Returns [(goal, path, cost), ...].
+    """
+    source, goals = task
+    if isinstance(SHARED_GRAPH, Exception):
+        raise RuntimeError("worker could not attach the shared graph") from SHARED_GRAPH
+    indptr, indices, weights = SHARED_GRAPH[1]
+    distance = [float('inf')] * (len(indptr) - 1)
+    parent = [-1] * (len(indptr) - 1)
+    distance[source] = 0
+    remaining = set(goals)
+    queue = [(0, source)]
+    while queue and remaining:
+        cost, node = heapq.heappop(queue)
+        if cost > distance[node]:
+            continue
+        remaining.discard(node)
+        for i in range(indptr[node], indptr[node+1]):
+            neighbor, new_cost = indices[i], cost + weights[i]
+            if new_cost < distance[neighbor]:
+                distance[neighbor] = new_cost
+                parent[neighbor] = node
+                heapq.heappush(queue, (new_cost, neighbor))
+    
+    results = []
+    for goal in goals:
+        if distance[goal] == float('inf'):
+            results.append((goal, None, None))
+            continue
+        path = []
+        node = goal
+        while node != -1:
+            path.append(node)
+            node = parent[node]
+        cost = distance[goal]
+        results.append((goal, path[::-1], int(cost) if cost == int(cost) else cost))
+    return results
+
+def batch_shortest_paths(graph, queries, workers=None):
+    """
+    Shortest paths for many (start, goal) pairs on a dict or CSR graph.
+    The CSR arrays are copied once into shared memory and every pool
+    worker maps them by name, so the graph is never pickled. Queries with
+    the same start share one Dijkstra run. Returns [(path, cost), ...]
+    in query order.
+    """
+    if isinstance(graph, dict):
+        graph = dict_to_csr(graph)
+    groups = {}
+    for start, goal in queries:
+        groups.setdefault(start, []).append(goal)
+    
+    blocks = []
+    spec = []
+    try:
+        for part in graph:
+            part = np.ascontiguousarray(part)
+            block = shared_memory.SharedMemory(create=True, size=max(part.nbytes, 1))
+            np.ndarray(part.shape, dtype=part.dtype, buffer=block.buf)[:] = part
+            blocks.append(block)
+            spec.append((block.name, part.dtype.char, part.size))
+        answers = {}
+        with multiprocessing.Pool(workers or os.cpu_count(), attach_shared_graph, (spec,)) as pool:
+            for (start, _), results in zip(groups.items(), pool.imap(solve_source_group, groups.items())):
+                for goal, path, cost in results:
+                    answers[(start, goal)] = (path, cost)
+            # Let workers exit normally so they close their handles
+            pool.close()
+            pool.join()
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return [answers[query] for query in queries]
+
+LAYOUT_CACHE = {}
+
+def graph_fingerprint(G):
+    """Hash of the nodes and weighted edges, independent of insertion order."""
+    digest = hashlib.sha1()
+    digest.update(np.array(sorted(G.nodes()), dtype=np.int64).tobytes())
+    edges = sorted((min(u, v), max(u, v), w) for u, v, w in G.edges.data('weight', default=1))
+    digest.update(np.array(edges, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+def graph_layout(G, cache_dir=None):
+    """
+    Node positions, cached by graph fingerprint in memory and, with
+    cache_dir, on disk. Spring layout up to 500 nodes; past that its
+    O(n^2) iterations take minutes, so a rank-spread spectral layout
+    is used instead.
+    """
+    key = graph_fingerprint(G)
+    if key in LAYOUT_CACHE:
+        return LAYOUT_CACHE[key]
+    filename = os.path.join(cache_dir, key + ".pkl") if cache_dir else None
+    if filename and os.path.exists(filename):
+        with open(filename, 'rb') as f:
+            pos = pickle.load(f)
+    else:
+        if G.number_of_nodes() <= 500:
+            # Large k spreads small graphs out for readable labels
+            pos = nx.spring_layout(G, k=5.0 if G.number_of_nodes() <= 100 else None, iterations=200, seed=42)
+        else:
+            # Spectral coordinates bunch up around a few outliers; spread each axis by rank
+            pos = nx.spectral_layout(G)
+            nodes = list(pos)
+            xy = np.array([pos[node] for node in nodes])
+            xy = np.argsort(np.argsort(xy, axis=0), axis=0) / max(len(nodes) - 1, 1) * 2 - 1
+            pos = dict(zip(nodes, xy))
+        if filename:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(filename, 'wb') as f:
+                pickle.dump(pos, f)
+    LAYOUT_CACHE[key] = pos
+    return pos
+
+def path_neighborhood(G, path, hops):
+    """Subgraph of every node within hops edges of the path."""
+    seen = set(path)
+    frontier = list(path)
+    for _ in range(hops):
+        frontier = [neighbor for node in frontier for neighbor in G.adj[node] if neighbor not in seen]
+        seen.update(frontier)
+    return G.subgraph(seen)
+
+def display_graph(G, shortest_path, start, goal, output=None, hops=None, cache_dir=None):
+    """
+    Draw G with the shortest path in red. With hops only the k-hop
+    neighbourhood of the path is drawn. Edges are drawn as one
+    LineCollection; node and weight labels only for graphs up to 100
+    nodes. With output (a .png or .svg name) the figure is saved instead
+    of shown, so it works without a display.
+    """
+    if hops is not None and shortest_path:
+        G = path_neighborhood(G, shortest_path, hops)
+    pos = graph_layout(G, cache_dir)
+    small = G.number_of_nodes() <= 100
+    
+    # Large figure for maximum spacing
+    fig, ax = plt.subplots(figsize=(20, 16))
+    
+    edges = np.array([(pos[u], pos[v]) for u, v in G.edges()]).reshape(-1, 2, 2)
+    ax.add_collection(LineCollection(edges, colors='gray', linewidths=1.5 if small else 0.3, alpha=0.9))
+    xy = np.array([pos[node] for node in G.nodes()]).reshape(-1, 2)
+    ax.scatter(xy[:, 0], xy[:, 1], s=1200 if small else 10, c='lightblue', alpha=0.9, zorder=2, label='Nodes')
+    
+    # Highlight start and goal nodes
+    ax.scatter(*pos[start], s=1500 if small else 80, c='green', zorder=2, label='Start Node')
+    ax.scatter(*pos[goal], s=1500 if small else 80, c='orange', zorder=2, label='Goal Node')
+    
+    if small:
+        nx.draw_networkx_labels(G, pos, font_size=14, ax=ax)
+        # Edge weights with a background so they stay readable
+        nx.draw_networkx_edge_labels(G, pos, 
+                                    edge_labels=nx.get_edge_attributes(G, 'weight'),
+                                    font_size=12,
+                                    label_pos=0.5,
+                                    bbox=dict(facecolor='white', 
+                                            edgecolor='none',
+                                            alpha=0.7,
+                                            pad=2),
+                                    ax=ax)
     
     # Draw the shortest path if it exists
     if shortest_path and len(shortest_path) > 1:
-        path_edges = list(zip(shortest_path[:-1], shortest_path[1:]))
-        nx.draw_networkx_edges(G, pos, 
-                             edgelist=path_edges,
-                             edge_color='red',
-                             width=3.5)
-    
-    # Highlight start and goal nodes with larger sizes
-    nx.draw_networkx_nodes(G, pos, 
-                          nodelist=[start],
-                          node_color='green',
-                          node_size=1500)
-    nx.draw_networkx_nodes(G, pos,
-                          nodelist=[goal],
-                          node_color='orange',
-                          node_size=1500)
-    
-    plt.title("Sparse Graph with Shortest Path", 
-              pad=20,
-              size=16,
-              fontweight='bold')
-    
-    # Added more padding around the graph
-    plt.margins(0.2)
-    
-    # Increased legend size and moved it outside the graph
-    plt.legend(['Nodes', 'Start Node', 'Goal Node', 'Shortest Path'],
-              fontsize=12,
-              bbox_to_anchor=(1.1, 1.05))
-    
-    plt.axis('off')
-    # Adjusted layout to account for legend
-    plt.tight_layout()
-    plt.show()
+        path_edges = [(pos[u], pos[v]) for u, v in zip(shortest_path[:-1], shortest_path[1:])]
+        ax.add_collection(LineCollection(path_edges, colors='red', linewidths=3.5, label='Shortest Path'))
+    
+    ax.set_title("Sparse Graph with Shortest Path", 
+                 pad=20,
+                 size=16,
+                 fontweight='bold')
+    
+    # Padding around the graph, legend outside it
+    ax.autoscale()
+    ax.margins(0.2)
+    ax.legend(fontsize=12, markerscale=0.4 if small else 1, bbox_to_anchor=(1.1, 1.05))
+    ax.axis('off')
+    fig.tight_layout()
+    
+    if output:
+        fig.savefig(output, bbox_inches='tight')
+        plt.close(fig)
+    else:
+        plt.show()
 
 def main():
     # Water Jug Problem
@@ -184,7 +815,8 @@ def main():
     start_node, goal_node = random.sample(range(20), 2)
     print(f"Randomly Selected Start Node: {start_node}, Goal Node: {goal_node}")
     
-    shortest_path, path_cost = a_star_sparse_graph(graph_dict, start_node, goal_node)
+    landmarks = Landmarks(graph_dict)
+    shortest_path, path_cost = a_star_sparse_graph(graph_dict, start_node, goal_node, landmarks)
     if shortest_path:
         print(f"\nShortest Path Found: {' -> '.join(map(str, shortest_path))}")
         print(f"Total Path Cost: {path_cost}")
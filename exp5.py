@@ -1,87 +1,240 @@
-import pygame
 import random
 import math
+from collections import deque
 
-# Initialize pygame
-pygame.init()
+import numpy as np
 
 # Game Constants
 WIDTH, HEIGHT = 600, 400
 GRID_SIZE = 20
+COLS, ROWS = WIDTH // GRID_SIZE, HEIGHT // GRID_SIZE
 WHITE, GREEN, RED, BLACK = (255, 255, 255), (34, 139, 34), (255, 0, 0), (0, 0, 0)
 
-# Set up display
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Realistic Snake Game")
-
-# Snake properties
-snake = [(100, 100), (90, 100), (80, 100)]  # List of segments (x, y)
-direction = (GRID_SIZE, 0)  # Moving right initially
-food = (random.randrange(0, WIDTH, GRID_SIZE), random.randrange(0, HEIGHT, GRID_SIZE))
-clock = pygame.time.Clock()
-running = True
-score = 0
-
-# Function to draw snake with smooth curves
-def draw_snake(snake):
-    for i, segment in enumerate(snake):
-        size = GRID_SIZE // 2
-        pygame.draw.circle(screen, GREEN, (segment[0] + size, segment[1] + size), size)
-        if i == 0:  # Add eyes to the snake head
-            eye_offset = 5
-            pygame.draw.circle(screen, WHITE, (segment[0] + size - eye_offset, segment[1] + size - eye_offset), 3)
-            pygame.draw.circle(screen, WHITE, (segment[0] + size + eye_offset, segment[1] + size - eye_offset), 3)
-
-# Function to move snake smoothly
-def move_snake():
-    global running, food, score
-    new_head = (snake[0][0] + direction[0], snake[0][1] + direction[1])
-
-    # Check for collisions (wall or self)
-    if (
-        new_head in snake or
-        new_head[0] < 0 or new_head[0] >= WIDTH or
-        new_head[1] < 0 or new_head[1] >= HEIGHT
-    ):
-        running = False
-
-    snake.insert(0, new_head)  # Move forward
-
-    # Check if food is eaten
-    if new_head == food:
-        score += 1
-        food = (random.randrange(0, WIDTH, GRID_SIZE), random.randrange(0, HEIGHT, GRID_SIZE))
-    else:
-        snake.pop()  # Remove tail if no food eaten
-
-# Main game loop
-while running:
-    screen.fill(BLACK)
-
-    # Handle events
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_UP and direction != (0, GRID_SIZE):
-                direction = (0, -GRID_SIZE)
-            elif event.key == pygame.K_DOWN and direction != (0, -GRID_SIZE):
-                direction = (0, GRID_SIZE)
-            elif event.key == pygame.K_LEFT and direction != (GRID_SIZE, 0):
-                direction = (-GRID_SIZE, 0)
-            elif event.key == pygame.K_RIGHT and direction != (-GRID_SIZE, 0):
-                direction = (GRID_SIZE, 0)
-
-    move_snake()
-
-    # Draw food
-    pygame.draw.circle(screen, RED, (food[0] + GRID_SIZE // 2, food[1] + GRID_SIZE // 2), GRID_SIZE // 2)
-
-    # Draw snake with smoother look
-    draw_snake(snake)
-
-    pygame.display.flip()
-    clock.tick(10)  # Adjust speed
-
-pygame.quit()
-print(f"Game Over! Your Score: {score}")
+# Directions as (dx, dy) in cells; index order is the action number for SnakeBatch
+UP, DOWN, LEFT, RIGHT = (0, -1), (0, 1), (-1, 0), (1, 0)
+DIRECTIONS = (UP, DOWN, LEFT, RIGHT)
+
+def start_body(cols, rows):
+    """
+    Starting cells head first: three segments in a row facing right, head
+    at (5, 5) or as close to it as the board allows.
+    """
+    if cols < 3 or rows < 1 or cols * rows < 4:
+        raise ValueError(f"a {cols}x{rows} board has no room for a 3-cell snake and food")
+    x, y = min(5, cols - 1), min(5, rows - 1)
+    return [(x, y), (x - 1, y), (x - 2, y)]
+
+class SnakeGame:
+    """
+    Snake rules on a cols x rows grid, without any display. The body is a
+    deque of cells (head first) mirrored in an occupancy grid, so moving
+    and collision checks are O(1). Free cells are kept in a list with each
+    cell's slot in it, so food is sampled uniformly from free cells in O(1).
+    """
+    def __init__(self, cols=COLS, rows=ROWS, seed=None):
+        self.start = start_body(cols, rows)
+        self.cols, self.rows = cols, rows
+        self.rng = random.Random(seed)
+        self.reset()
+
+    def reset(self):
+        cols, rows = self.cols, self.rows
+        self.occupied = bytearray(cols * rows)
+        self.free = list(range(cols * rows))
+        self.slot = list(range(cols * rows))  # cell -> index in self.free
+        self.body = deque()
+        for x, y in self.start:
+            self.body.append((x, y))
+            self.occupy(y * cols + x)
+        self.direction = RIGHT
+        self.score = 0
+        self.alive = True
+        self.food = self.place_food()
+
+    def occupy(self, cell):
+        self.occupied[cell] = 1
+        # Swap the cell with the last free one, then drop it
+        last = self.free[-1]
+        index = self.slot[cell]
+        self.free[index], self.slot[last] = last, index
+        self.free.pop()
+
+    def release(self, cell):
+        self.occupied[cell] = 0
+        self.slot[cell] = len(self.free)
+        self.free.append(cell)
+
+    def place_food(self):
+        """A uniformly random free cell, or None once the snake fills the grid."""
+        if not self.free:
+            return None
+        cell = self.free[self.rng.randrange(len(self.free))]
+        return (cell % self.cols, cell // self.cols)
+
+    def turn(self, direction):
+        # Reversing straight into the neck is ignored
+        if (direction[0] + self.direction[0], direction[1] + self.direction[1]) != (0, 0):
+            self.direction = direction
+
+    def step(self, direction=None):
+        """Advance one tick. Returns (alive, ate)."""
+        if not self.alive:
+            return False, False
+        if direction is not None:
+            self.turn(direction)
+        x, y = self.body[0]
+        x, y = x + self.direction[0], y + self.direction[1]
+
+        # Check for collisions (wall or self)
+        if not (0 <= x < self.cols and 0 <= y < self.rows) or self.occupied[y * self.cols + x]:
+            self.alive = False
+            return False, False
+
+        self.body.appendleft((x, y))  # Move forward
+        self.occupy(y * self.cols + x)
+
+        # Check if food is eaten
+        if (x, y) == self.food:
+            self.score += 1
+            self.food = self.place_food()
+            if self.food is None:
+                self.alive = False  # Board full, nothing left to eat
+            return self.alive, True
+        tail_x, tail_y = self.body.pop()  # Remove tail if no food eaten
+        self.release(tail_y * self.cols + tail_x)
+        return True, False
+
+class SnakeBatch:
+    """
+    Many independent games stepped in lockstep with NumPy. Each game keeps
+    its body as a ring buffer of cell indices plus a boolean occupancy row;
+    actions index DIRECTIONS. Finished games restart automatically, and
+    their final scores are reported in the step that ended them.
+    """
+    def __init__(self, games, cols=COLS, rows=ROWS, seed=None):
+        # Ring buffer order is tail to head
+        self.start = np.array([y * cols + x for x, y in reversed(start_body(cols, rows))])
+        self.games, self.cols, self.rows = games, cols, rows
+        self.cells = cols * rows
+        self.rng = np.random.default_rng(seed)
+        self.moves = np.array(DIRECTIONS, dtype=np.int64)
+        self.body = np.zeros((games, self.cells), dtype=np.int32)
+        self.occupied = np.zeros((games, self.cells), dtype=bool)
+        self.head = np.zeros(games, dtype=np.int64)  # Ring index of the head
+        self.length = np.zeros(games, dtype=np.int64)
+        self.direction = np.zeros(games, dtype=np.int64)
+        self.food = np.zeros(games, dtype=np.int64)
+        self.score = np.zeros(games, dtype=np.int64)
+        self.reset(np.ones(games, dtype=bool))
+
+    def reset(self, mask):
+        index = np.flatnonzero(mask)
+        self.occupied[index] = False
+        self.body[index, :3] = self.start
+        self.occupied[index[:, None], self.start] = True
+        self.head[index] = 2
+        self.length[index] = 3
+        self.direction[index] = 3  # RIGHT
+        self.score[index] = 0
+        self.place_food(index)
+
+    def place_food(self, index):
+        """Uniform free cell for each listed game: the k-th zero of its occupancy row."""
+        if len(index) == 0:
+            return
+        free = ~self.occupied[index]
+        counts = free.sum(axis=1)
+        k = (self.rng.random(len(index)) * counts).astype(np.int64)
+        self.food[index] = np.argmax(np.cumsum(free, axis=1) > k[:, None], axis=1)
+        self.food[index[counts == 0]] = -1  # Board full
+
+    def step(self, actions):
+        """
+        Advance every game one tick. Returns (ate, done, final_score);
+        final_score is meaningful where done is True.
+        """
+        games = np.arange(self.games)
+        actions = np.asarray(actions, dtype=np.int64)
+        # Reversing into the neck keeps the current direction
+        turn = (self.moves[actions] + self.moves[self.direction]).any(axis=1)
+        self.direction = np.where(turn, actions, self.direction)
+
+        head_cell = self.body[games, self.head]
+        x = head_cell % self.cols + self.moves[self.direction, 0]
+        y = head_cell // self.cols + self.moves[self.direction, 1]
+        wall = (x < 0) | (x >= self.cols) | (y < 0) | (y >= self.rows)
+        cell = np.where(wall, 0, y * self.cols + x)
+        done = wall | self.occupied[games, cell]
+        ate = ~done & (cell == self.food)
+
+        # Free the tail of every game that moved without eating
+        moved = np.flatnonzero(~done & ~ate)
+        tail = (self.head[moved] - self.length[moved] + 1) % self.cells
+        self.occupied[moved, self.body[moved, tail]] = False
+
+        alive = np.flatnonzero(~done)
+        self.head[alive] = (self.head[alive] + 1) % self.cells
+        self.body[alive, self.head[alive]] = cell[alive]
+        self.occupied[alive, cell[alive]] = True
+        self.length += ate
+        self.score += ate
+        self.place_food(np.flatnonzero(ate))
+        done |= ate & (self.food == -1)
+
+        final_score = self.score.copy()
+        self.reset(done)
+        return ate, done, final_score
+
+if __name__ == "__main__":
+    import pygame
+
+    # Initialize pygame
+    pygame.init()
+
+    # Set up display
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Realistic Snake Game")
+
+    game = SnakeGame()
+    clock = pygame.time.Clock()
+    running = True
+
+    # Function to draw snake with smooth curves
+    def draw_snake(snake):
+        for i, (x, y) in enumerate(snake):
+            size = GRID_SIZE // 2
+            segment = (x * GRID_SIZE, y * GRID_SIZE)
+            pygame.draw.circle(screen, GREEN, (segment[0] + size, segment[1] + size), size)
+            if i == 0:  # Add eyes to the snake head
+                eye_offset = 5
+                pygame.draw.circle(screen, WHITE, (segment[0] + size - eye_offset, segment[1] + size - eye_offset), 3)
+                pygame.draw.circle(screen, WHITE, (segment[0] + size + eye_offset, segment[1] + size - eye_offset), 3)
+
+    keys = {pygame.K_UP: UP, pygame.K_DOWN: DOWN, pygame.K_LEFT: LEFT, pygame.K_RIGHT: RIGHT}
+
+    # Main game loop
+    while running:
+        screen.fill(BLACK)
+
+        # Handle events
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN and event.key in keys:
+                game.turn(keys[event.key])
+
+        running = game.step()[0] and running
+
+        # Draw food
+        if game.food is not None:
+            food = (game.food[0] * GRID_SIZE, game.food[1] * GRID_SIZE)
+            pygame.draw.circle(screen, RED, (food[0] + GRID_SIZE // 2, food[1] + GRID_SIZE // 2), GRID_SIZE // 2)
+
+        # Draw snake with smoother look
+        draw_snake(game.body)
+
+        pygame.display.flip()
+        clock.tick(10)  # Adjust speed
+
+    pygame.quit()
+    print(f"Game Over! Your Score: {game.score}")
@@ -1,47 +1,205 @@
 import networkx as nx
 import matplotlib.pyplot as plt
+import os
+import pickle
+from array import array
 from collections import deque
+from functools import lru_cache
+
+from exp4 import water_jug_min_steps
 
 def is_valid(state, capacities):
     return 0 <= state[0] <= capacities[0] and 0 <= state[1] <= capacities[1]
 
-def bfs_water_jug(capacities, target):
-    visited = set()
-    queue = deque([((0, 0), [])])  # (current state, path to state)
-    graph = nx.DiGraph()
+class SearchGraph:
+    """
+    Edges discovered by the BFS, kept as two parallel arrays of packed
+    states (jug1 * (capacity2 + 1) + jug2). Only converted to networkx
+    when it is drawn.
+    """
+    def __init__(self, capacities):
+        self.width = capacities[1] + 1
+        self.sources = array('q')
+        self.targets = array('q')
+    
+    def add_edge(self, source, target):
+        self.sources.append(source)
+        self.targets.append(target)
+    
+    def __len__(self):
+        return len(self.sources)
+    
+    def unpack(self, packed):
+        return divmod(packed, self.width)
+    
+    def to_networkx(self):
+        graph = nx.DiGraph()
+        graph.add_node((0, 0))
+        graph.add_edges_from((self.unpack(u), self.unpack(v)) for u, v in zip(self.sources, self.targets))
+        return graph
+
+def bfs_water_jug(capacities, target, capture=False):
+    """
+    Breadth-first search from (0, 0) until either jug holds target.
+    Queue entries are packed integers and the path is rebuilt from a
+    predecessor map, so nothing is copied per node. With capture=True every
+    edge from an expanded state to a successor not yet expanded is recorded
+    in a SearchGraph for draw_graph; the predecessor map only serves the path.
+    Returns (path, graph); graph is None unless captured.
+    """
+    cap1, cap2 = capacities
+    width = cap2 + 1
+    graph = SearchGraph(capacities) if capture else None
+    
+    # Impossible targets are known from the gcd without exhausting the space
+    if water_jug_min_steps(cap1, cap2, target)[0] is None:
+        return None, graph
+    
+    parent = {0: -1}  # packed state -> packed predecessor
+    queue = deque([0])
+    expanded = set()  # Only filled when capturing
     
     while queue:
-        (current, path) = queue.popleft()
-        
-        if current in visited:
-            continue
-        
-        visited.add(current)
-        graph.add_node(current)
-        
-        new_path = path + [current]
+        current = queue.popleft()
+        jug1, jug2 = divmod(current, width)
         
-        if current[0] == target or current[1] == target:
-            return new_path, graph
+        if jug1 == target or jug2 == target:
+            path = []
+            while current != -1:
+                path.append(divmod(current, width))
+                current = parent[current]
+            return path[::-1], graph
         
-        jug1, jug2 = current
-        successors = [
-            (capacities[0], jug2),  # Fill jug1
-            (jug1, capacities[1]),  # Fill jug2
-            (0, jug2),  # Empty jug1
-            (jug1, 0),  # Empty jug2
-            (max(0, jug1 - (capacities[1] - jug2)), min(capacities[1], jug2 + jug1)),  # Pour jug1 -> jug2
-            (min(capacities[0], jug1 + jug2), max(0, jug2 - (capacities[0] - jug1)))   # Pour jug2 -> jug1
-        ]
+        pour12 = min(jug1, cap2 - jug2)
+        pour21 = min(jug2, cap1 - jug1)
+        successors = (
+            cap1 * width + jug2,  # Fill jug1
+            jug1 * width + cap2,  # Fill jug2
+            jug2,  # Empty jug1
+            jug1 * width,  # Empty jug2
+            (jug1 - pour12) * width + jug2 + pour12,  # Pour jug1 -> jug2
+            (jug1 + pour21) * width + jug2 - pour21   # Pour jug2 -> jug1
+        )
         
         for state in successors:
-            if state not in visited and is_valid(state, capacities):
-                queue.append((state, new_path))
-                graph.add_edge(current, state)
+            if state not in parent:
+                parent[state] = current
+                queue.append(state)
+        if capture:
+            expanded.add(current)
+            for state in successors:
+                if state not in expanded:
+                    graph.add_edge(current, state)
     
     return None, graph
 
+class JugDistanceTable:
+    """
+    One full BFS from (0, 0) for a pair of capacities. Distances and
+    predecessors are flat arrays indexed by packed state, and nearest[t]
+    is the closest state with either jug holding t, so any target is
+    answered in O(path) without searching again.
+    """
+    def __init__(self, capacities):
+        self.capacities = tuple(capacities)
+        cap1, cap2 = self.capacities
+        self.width = cap2 + 1
+        size = (cap1 + 1) * self.width
+        self.distance = array('i', [-1]) * size
+        self.parent = array('q', [-1]) * size
+        self.nearest = array('q', [-1]) * (max(cap1, cap2) + 1)
+        self.build()
+    
+    def build(self):
+        cap1, cap2 = self.capacities
+        width = self.width
+        distance, parent, nearest = self.distance, self.parent, self.nearest
+        distance[0] = 0
+        queue = deque([0])
+        
+        while queue:
+            current = queue.popleft()
+            jug1, jug2 = divmod(current, width)
+            # BFS order reaches each amount first at its smallest distance
+            if nearest[jug1] == -1:
+                nearest[jug1] = current
+            if nearest[jug2] == -1:
+                nearest[jug2] = current
+            
+            pour12 = min(jug1, cap2 - jug2)
+            pour21 = min(jug2, cap1 - jug1)
+            for state in (cap1 * width + jug2, jug1 * width + cap2, jug2, jug1 * width,
+                          (jug1 - pour12) * width + jug2 + pour12, (jug1 + pour21) * width + jug2 - pour21):
+                if distance[state] == -1:
+                    distance[state] = distance[current] + 1
+                    parent[state] = current
+                    queue.append(state)
+    
+    def steps(self, target):
+        """Fewest operations until a jug holds target, or None."""
+        if not 0 <= target < len(self.nearest) or self.nearest[target] == -1:
+            return None
+        return self.distance[self.nearest[target]]
+    
+    def path(self, target):
+        if self.steps(target) is None:
+            return None
+        current = self.nearest[target]
+        path = []
+        while current != -1:
+            path.append(divmod(current, self.width))
+            current = self.parent[current]
+        return path[::-1]
+    
+    def reachable_targets(self):
+        """Every amount some jug can hold, mapped to its step count."""
+        return {target: self.distance[state] for target, state in enumerate(self.nearest) if state != -1}
+    
+    def save(self, filename):
+        with open(filename, 'wb') as f:
+            pickle.dump({
+                "capacities": self.capacities,
+                "distance": self.distance,
+                "parent": self.parent,
+                "nearest": self.nearest,
+            }, f)
+    
+    @classmethod
+    def load(cls, filename):
+        with open(filename, 'rb') as f:
+            data = pickle.load(f)
+        table = cls.__new__(cls)
+        table.capacities = data["capacities"]
+        table.width = table.capacities[1] + 1
+        table.distance = data["distance"]
+        table.parent = data["parent"]
+        table.nearest = data["nearest"]
+        return table
+
+def jug_distance_table(capacities, directory=None):
+    """
+    Shared JugDistanceTable per capacity pair; capacities may be any
+    sequence. With a directory the table is read from, or written to,
+    jugs_<cap1>_<cap2>.pkl there.
+    """
+    return cached_jug_distance_table(tuple(int(c) for c in capacities), directory)
+
+@lru_cache(maxsize=32)
+def cached_jug_distance_table(capacities, directory=None):
+    """LRU cache behind jug_distance_table, keyed by the capacity tuple."""
+    if directory is None:
+        return JugDistanceTable(capacities)
+    filename = os.path.join(directory, "jugs_%d_%d.pkl" % capacities)
+    if os.path.exists(filename):
+        return JugDistanceTable.load(filename)
+    table = JugDistanceTable(capacities)
+    os.makedirs(directory, exist_ok=True)
+    table.save(filename)
+    return table
+
 def draw_graph(graph, path):
+    if isinstance(graph, SearchGraph):
+        graph = graph.to_networkx()
     plt.figure(figsize=(8, 6))
     pos = nx.spring_layout(graph)
     nx.draw(graph, pos, with_labels=True, node_color='lightblue', edge_color='gray', node_size=2000, font_size=10)
@@ -53,9 +211,16 @@ def draw_graph(graph, path):
 if __name__ == "__main__":
     jug1_capacity = int(input("Enter the capacity of Jug 1: "))
     jug2_capacity = int(input("Enter the capacity of Jug 2: "))
-    target_amount = int(input("Enter the target amount: "))
+    target_input = input("Enter the target amount (or 'all'): ").strip().lower()
+    
+    if target_input == "all":
+        table = jug_distance_table((jug1_capacity, jug2_capacity))
+        for target, steps in table.reachable_targets().items():
+            print(f"Target {target}: {steps} steps, path {table.path(target)}")
+        raise SystemExit
     
-    path, graph = bfs_water_jug((jug1_capacity, jug2_capacity), target_amount)
+    target_amount = int(target_input)
+    path, graph = bfs_water_jug((jug1_capacity, jug2_capacity), target_amount, capture=True)
     
     if path:
         print("Solution path:", path)
@@ -1,6 +1,15 @@
+from array import array
 from collections import deque
-from typing import List, Set, Tuple, Optional
+from functools import lru_cache
+from typing import Dict, Iterator, List, Set, Tuple, Optional
+import argparse
+import csv
 import datetime
+import json
+import multiprocessing
+import pickle
+import sys
+import time
 
 class State:
     def __init__(self, m_left: int, c_left: int, boat: bool, m_right: int, c_right: int, parent=None):
@@ -43,15 +52,19 @@ def is_valid_state(state: State, total_missionaries: int, total_cannibals: int)
     return True
 
 
+def get_boat_loads(boat_capacity: int) -> List[Tuple[int, int]]:
+    """Every (missionaries, cannibals) load of 1 to boat_capacity people."""
+    loads = [(m, 0) for m in range(1, boat_capacity + 1)]
+    loads += [(0, c) for c in range(1, boat_capacity + 1)]
+    loads += [(m, c) for m in range(1, boat_capacity) for c in range(1, boat_capacity - m + 1)]
+    return loads
+
+
 def get_next_states(current: State, total_missionaries: int, total_cannibals: int, boat_capacity: int) -> List[State]:
     next_states = []
-    moves = [(1, 0), (2, 0), (0, 1), (0, 2), (1, 1)]  # Possible moves: (missionaries, cannibals)
+    moves = get_boat_loads(boat_capacity)  # Possible moves: (missionaries, cannibals)
     
     for m, c in moves:
-        # Ensure the boat doesn't carry more than its capacity
-        if m + c > boat_capacity:
-            continue
-        
         new_state = None
         if current.boat:
             new_state = State(
@@ -77,8 +90,179 @@ def get_next_states(current: State, total_missionaries: int, total_cannibals: in
             
     return next_states
 
+def solve_crossing(initial_state: State, goal_state: State, total_missionaries: int, total_cannibals: int,
+                   boat_capacity: int, stats: Optional[dict] = None) -> Optional[List[State]]:
+    """
+    Breadth-first search for the shortest crossing sequence. States are
+    kept as (m_left, c_left, boat) keys and deduplicated when enqueued.
+    Returns the States from initial to goal, linked through parent, or
+    None if the goal cannot be reached. If stats is given, the number of
+    expanded states is stored in stats["expanded"].
+    """
+    loads = get_boat_loads(boat_capacity)
+    start = (initial_state.m_left, initial_state.c_left, initial_state.boat)
+    goal = (goal_state.m_left, goal_state.c_left, goal_state.boat)
+    parents = {start: None}
+    queue = deque([start])
+    expanded = 0
+    
+    while queue and goal not in parents:
+        m_left, c_left, boat = queue.popleft()
+        expanded += 1
+        # People on the boat's bank, and which way the left bank changes
+        if boat:
+            m_here, c_here, sign = m_left, c_left, -1
+        else:
+            m_here, c_here, sign = total_missionaries - m_left, total_cannibals - c_left, 1
+        
+        for m, c in loads:
+            if m > m_here or c > c_here:
+                continue
+            new_m_left = m_left + sign * m
+            new_c_left = c_left + sign * c
+            new_m_right = total_missionaries - new_m_left
+            new_c_right = total_cannibals - new_c_left
+            if (new_m_left > 0 and new_m_left < new_c_left) or \
+               (new_m_right > 0 and new_m_right < new_c_right):
+                continue
+            next_key = (new_m_left, new_c_left, not boat)
+            if next_key not in parents:
+                parents[next_key] = (m_left, c_left, boat)
+                queue.append(next_key)
+    
+    if stats is not None:
+        stats["expanded"] = expanded
+    if goal not in parents:
+        return None
+    
+    keys = []
+    key = goal
+    while key is not None:
+        keys.append(key)
+        key = parents[key]
+    path = []
+    parent = None
+    for m_left, c_left, boat in reversed(keys):
+        parent = State(m_left, c_left, boat, total_missionaries - m_left, total_cannibals - c_left, parent)
+        path.append(parent)
+    return path
+
+class CrossingGraph:
+    """
+    The whole state space for fixed totals and boat capacity, built once.
+    Node i encodes (m_left, c_left, boat) as (m_left * (C + 1) + c_left) * 2 + boat,
+    and transitions are stored CSR-style: the neighbours of node i are
+    targets[offsets[i]:offsets[i + 1]]. BFS distance and predecessor arrays
+    are cached per source, so each later query costs O(path length).
+    """
+    def __init__(self, total_missionaries: int, total_cannibals: int, boat_capacity: int):
+        self.total_missionaries = total_missionaries
+        self.total_cannibals = total_cannibals
+        self.boat_capacity = boat_capacity
+        self.size = (total_missionaries + 1) * (total_cannibals + 1) * 2
+        self.searches: Dict[int, Tuple[array, array]] = {}
+        
+        loads = get_boat_loads(boat_capacity)
+        self.offsets = array('i', [0])
+        self.targets = array('i')
+        for node in range(self.size):
+            m_left, c_left, boat = self.unpack(node)
+            if self.is_valid(m_left, c_left):
+                if boat:
+                    m_here, c_here, sign = m_left, c_left, -1
+                else:
+                    m_here, c_here, sign = total_missionaries - m_left, total_cannibals - c_left, 1
+                for m, c in loads:
+                    if m > m_here or c > c_here:
+                        continue
+                    new_m_left, new_c_left = m_left + sign * m, c_left + sign * c
+                    if self.is_valid(new_m_left, new_c_left):
+                        self.targets.append(self.pack(new_m_left, new_c_left, not boat))
+            self.offsets.append(len(self.targets))
+    
+    def pack(self, m_left: int, c_left: int, boat: bool) -> int:
+        return (m_left * (self.total_cannibals + 1) + c_left) * 2 + int(boat)
+    
+    def unpack(self, node: int) -> Tuple[int, int, bool]:
+        bank, boat = divmod(node, 2)
+        m_left, c_left = divmod(bank, self.total_cannibals + 1)
+        return m_left, c_left, bool(boat)
+    
+    def is_valid(self, m_left: int, c_left: int) -> bool:
+        m_right = self.total_missionaries - m_left
+        c_right = self.total_cannibals - c_left
+        return not ((m_left > 0 and m_left < c_left) or (m_right > 0 and m_right < c_right))
+    
+    def search_from(self, source: int) -> Tuple[array, array]:
+        """BFS distance and predecessor arrays from source, -1 if unreached."""
+        if source not in self.searches:
+            distance = array('i', [-1]) * self.size
+            predecessor = array('i', [-1]) * self.size
+            distance[source] = 0
+            queue = deque([source])
+            offsets, targets = self.offsets, self.targets
+            while queue:
+                node = queue.popleft()
+                for i in range(offsets[node], offsets[node + 1]):
+                    neighbor = targets[i]
+                    if distance[neighbor] < 0:
+                        distance[neighbor] = distance[node] + 1
+                        predecessor[neighbor] = node
+                        queue.append(neighbor)
+            self.searches[source] = (distance, predecessor)
+        return self.searches[source]
+    
+    def shortest_path(self, initial_state: State, goal_state: State) -> Optional[List[State]]:
+        """Same result as solve_crossing, answered from the cached tables."""
+        source = self.pack(initial_state.m_left, initial_state.c_left, initial_state.boat)
+        target = self.pack(goal_state.m_left, goal_state.c_left, goal_state.boat)
+        distance, predecessor = self.search_from(source)
+        if distance[target] < 0:
+            return None
+        
+        nodes = []
+        node = target
+        while node >= 0:
+            nodes.append(node)
+            node = predecessor[node]
+        path = []
+        parent = None
+        for node in reversed(nodes):
+            m_left, c_left, boat = self.unpack(node)
+            parent = State(m_left, c_left, boat, self.total_missionaries - m_left,
+                           self.total_cannibals - c_left, parent)
+            path.append(parent)
+        return path
+    
+    def save(self, filename: str):
+        """Write the transition table and every cached search to filename."""
+        with open(filename, 'wb') as f:
+            pickle.dump({
+                "key": (self.total_missionaries, self.total_cannibals, self.boat_capacity),
+                "offsets": self.offsets,
+                "targets": self.targets,
+                "searches": self.searches,
+            }, f)
+    
+    @classmethod
+    def load(cls, filename: str) -> "CrossingGraph":
+        with open(filename, 'rb') as f:
+            data = pickle.load(f)
+        graph = cls.__new__(cls)
+        graph.total_missionaries, graph.total_cannibals, graph.boat_capacity = data["key"]
+        graph.size = (graph.total_missionaries + 1) * (graph.total_cannibals + 1) * 2
+        graph.offsets = data["offsets"]
+        graph.targets = data["targets"]
+        graph.searches = data["searches"]
+        return graph
+
+@lru_cache(maxsize=32)
+def get_crossing_graph(total_missionaries: int, total_cannibals: int, boat_capacity: int) -> CrossingGraph:
+    """Shared CrossingGraph per (M, C, capacity)."""
+    return CrossingGraph(total_missionaries, total_cannibals, boat_capacity)
+
 def print_and_save_tree(initial_state: State, goal_state: State, file, total_missionaries: int, total_cannibals: int, boat_capacity: int):
-    visited = set()
+    visited = {initial_state}
     queue = deque([initial_state])
     level = 0
     level_nodes = 1
@@ -107,11 +291,12 @@ def print_and_save_tree(initial_state: State, goal_state: State, file, total_mis
             file.write(result + "\n")
             return
             
-        if current not in visited:
-            visited.add(current)
-            next_states = get_next_states(current, total_missionaries, total_cannibals, boat_capacity)
-            queue.extend(next_states)
-            next_level_nodes += len(next_states)
+        # Mark states when they are enqueued so duplicates never pile up
+        next_states = [state for state in get_next_states(current, total_missionaries, total_cannibals, boat_capacity)
+                       if state not in visited]
+        visited.update(next_states)
+        queue.extend(next_states)
+        next_level_nodes += len(next_states)
         
         if level_nodes == 0:
             level += 1
@@ -147,7 +332,7 @@ def main():
         file.write(f"Total cannibals: {total_cannibals}\n\n")
         
         # Get boat capacity input
-        boat_capacity = get_valid_input("Enter boat capacity (1 to 2): ", 2)
+        boat_capacity = get_valid_input("Enter boat capacity (1 to 100): ", 100)
         file.write(f"Boat capacity: {boat_capacity}\n\n")
         
         # Get initial state input
@@ -203,8 +388,136 @@ def main():
         
         # Generate and save the state space tree
         print_and_save_tree(initial_state, goal_state, file, total_missionaries, total_cannibals, boat_capacity)
+        
+        graph = get_crossing_graph(total_missionaries, total_cannibals, boat_capacity)
+        path = graph.shortest_path(initial_state, goal_state)
+        if path is None:
+            result = "\nNo crossing sequence reaches the goal state."
+        else:
+            result = f"\nShortest crossing sequence ({len(path) - 1} crossings):\n" + \
+                     "\n".join(f"  {step}: {state}" for step, state in enumerate(path))
+        print(result)
+        file.write(result + "\n")
     
     print(f"\nOutput has been saved to: {filename}")
 
+BATCH_FIELDS = ["missionaries", "cannibals", "capacity", "start", "goal",
+                "valid", "solvable", "path_length", "nodes_expanded", "seconds", "error"]
+
+def parse_range(text: str) -> List[int]:
+    """Parse '5', '1-10', '0-100:5' or a comma-separated mix of them."""
+    values = []
+    for part in text.split(','):
+        step = 1
+        if ':' in part:
+            part, step_text = part.split(':')
+            step = int(step_text)
+        if '-' in part:
+            low, high = part.split('-')
+            values.extend(range(int(low), int(high) + 1, step))
+        else:
+            values.append(int(part))
+    return values
+
+def parse_bank(text: str, total_missionaries: int, total_cannibals: int) -> Tuple[int, int, bool]:
+    """'left' (everyone and the boat on the left), 'right', or 'm_left,c_left,L|R'."""
+    if text == "left":
+        return total_missionaries, total_cannibals, True
+    if text == "right":
+        return 0, 0, False
+    if not isinstance(text, str):
+        raise TypeError(f"bank must be 'left', 'right' or 'm_left,c_left,L|R', not {text!r}")
+    m_left, c_left, boat = text.split(',')
+    return int(m_left), int(c_left), boat.strip().upper() in ("L", "LEFT", "Y", "1", "TRUE")
+
+def solve_job(job: dict) -> dict:
+    """
+    Solve one batch job; runs in a pool worker. start, goal and capacity
+    default as on the command line. A malformed job comes back as a row
+    with an error message instead of aborting the whole sweep.
+    """
+    if isinstance(job, dict) and "error" in job:
+        return dict(job, valid=False, solvable=False)  # Unreadable line flagged by batch_jobs
+    result = {"start": "left", "goal": "right", "capacity": 2}
+    try:
+        result.update(job)
+        total_m, total_c = int(result["missionaries"]), int(result["cannibals"])
+        capacity = int(result["capacity"])
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        start = parse_bank(result["start"], total_m, total_c)
+        goal = parse_bank(result["goal"], total_m, total_c)
+    except (KeyError, TypeError, ValueError) as error:
+        result.update(valid=False, solvable=False, error=f"{type(error).__name__}: {error}")
+        return result
+    initial_state = State(start[0], start[1], start[2], total_m - start[0], total_c - start[1])
+    goal_state = State(goal[0], goal[1], goal[2], total_m - goal[0], total_c - goal[1])
+    
+    began = time.perf_counter()
+    stats = {"expanded": 0}
+    valid = is_valid_state(initial_state, total_m, total_c) and is_valid_state(goal_state, total_m, total_c)
+    path = solve_crossing(initial_state, goal_state, total_m, total_c, capacity, stats) if valid else None
+    
+    result.update(valid=valid, solvable=path is not None,
+                  path_length=len(path) - 1 if path else None,
+                  nodes_expanded=stats["expanded"],
+                  seconds=round(time.perf_counter() - began, 6))
+    return result
+
+def batch_jobs(args) -> Iterator[dict]:
+    """
+    Jobs from a JSON Lines file, or the cross product of the range
+    arguments. A line that is not valid JSON becomes a job carrying only
+    an error, which solve_job reports as is.
+    """
+    if args.jobs:
+        with open(args.jobs, encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError as error:
+                        yield {"error": f"line {number}: {type(error).__name__}: {error}"}
+        return
+    for total_m in parse_range(args.missionaries):
+        for total_c in (parse_range(args.cannibals) if args.cannibals else [total_m]):
+            for capacity in parse_range(args.capacity):
+                for start in args.start or ["left"]:
+                    for goal in args.goal or ["right"]:
+                        yield {"missionaries": total_m, "cannibals": total_c,
+                               "capacity": capacity, "start": start, "goal": goal}
+
+def run_batch(argv: List[str]):
+    parser = argparse.ArgumentParser(description="Solve many missionaries-and-cannibals instances in parallel.")
+    parser.add_argument("--missionaries", default="3", help="range such as 3, 1-100 or 0-100:5")
+    parser.add_argument("--cannibals", help="range of cannibal totals (default: same as missionaries)")
+    parser.add_argument("--capacity", default="2", help="range of boat capacities")
+    parser.add_argument("--start", action="append", help="'left', 'right' or 'm_left,c_left,L|R' (repeatable)")
+    parser.add_argument("--goal", action="append", help="same format as --start (repeatable)")
+    parser.add_argument("--jobs", help="JSON Lines file of jobs; overrides the range arguments")
+    parser.add_argument("--output", help="results file, .csv or .jsonl (default: JSON Lines to stdout)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+    
+    out = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    as_csv = bool(args.output) and args.output.endswith(".csv")
+    writer = csv.DictWriter(out, fieldnames=BATCH_FIELDS, extrasaction='ignore') if as_csv else None
+    if writer:
+        writer.writeheader()
+    try:
+        with multiprocessing.Pool(args.workers) as pool:
+            for result in pool.imap_unordered(solve_job, batch_jobs(args), chunksize=16):
+                if writer:
+                    writer.writerow(result)
+                else:
+                    out.write(json.dumps(result) + "\n")
+                out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        run_batch(sys.argv[1:])
+    else:
+        main()